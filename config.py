@@ -1,11 +1,19 @@
+import copy
 import json
 import os
-from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
 
 CONFIG_PATH = "config.json"
 
-# Default configuration values
-DEFAULT_CONFIG = {
+# Default configuration values (read-only; copy with dict() before modifying)
+DEFAULT_CONFIG = MappingProxyType({
     "tracks_file": "data/tracks.json",
     "playlists_file": "data/playlists.json",
 
@@ -15,6 +23,9 @@ DEFAULT_CONFIG = {
     "average_download_time": 20,
     "retry_attempts": 3,
     "retry_delay": 5,
+    "retry_max_delay": 300,
+    "retry_concurrency": 1,
+    "max_parallel_playlists": 1,
     "auto_cleanup": False,
     "auto_backup": True,
     "max_backups": 10,
@@ -34,11 +45,11 @@ DEFAULT_CONFIG = {
     "musicbrainz_rate_limit": True,
     "musicbrainz_retries": 3,
     "musicbrainz_backoff_base": 0.75,
-}
+})
 
-# Profile definitions
-CONFIG_PROFILES = {
-    "light": {
+# Profile definitions (read-only)
+CONFIG_PROFILES = MappingProxyType({
+    "light": MappingProxyType({
         "retry_attempts": 1,
         "retry_delay": 3,
         "auto_cleanup": False,
@@ -53,8 +64,8 @@ CONFIG_PROFILES = {
         "musicbrainz_rate_limit": True,
         "musicbrainz_retries": 1,
         "musicbrainz_backoff_base": 0.5,
-    },
-    "advanced": {
+    }),
+    "advanced": MappingProxyType({
         "retry_attempts": 5,
         "retry_delay": 10,
         "auto_cleanup": False,
@@ -69,8 +80,8 @@ CONFIG_PROFILES = {
         "musicbrainz_rate_limit": True,
         "musicbrainz_retries": 5,
         "musicbrainz_backoff_base": 1.0,
-    },
-    "minimal": {
+    }),
+    "minimal": MappingProxyType({
         "retry_attempts": 0,
         "retry_delay": 0,
         "auto_cleanup": False,
@@ -85,11 +96,11 @@ CONFIG_PROFILES = {
         "musicbrainz_rate_limit": False,
         "musicbrainz_retries": 0,
         "musicbrainz_backoff_base": 0.5,
-    },
-}
+    }),
+})
 
 # Validation rules for config fields
-CONFIG_SCHEMA = {
+_SCHEMA_RULES = {
     "tracks_file": {"type": str, "required": True},
     "playlists_file": {"type": str, "required": True},
 
@@ -97,16 +108,19 @@ CONFIG_SCHEMA = {
     "audio_format": {
         "type": str,
         "required": True,
-        "choices": ["mp3", "wav", "flac", "aac", "ogg", "m4a"],
+        "choices": ("mp3", "wav", "flac", "aac", "ogg", "m4a"),
     },
     "sleep_between": {"type": (int, float), "required": True, "min": 0, "max": 60},
     "average_download_time": {"type": (int, float), "required": False, "min": 1, "max": 300},
     "retry_attempts": {"type": int, "required": False, "min": 0, "max": 10},
     "retry_delay": {"type": (int, float), "required": False, "min": 0, "max": 60},
+    "retry_max_delay": {"type": (int, float), "required": False, "min": 0, "max": 3600},
+    "retry_concurrency": {"type": int, "required": False, "min": 1, "max": 16},
+    "max_parallel_playlists": {"type": int, "required": False, "min": 1, "max": 8},
     "auto_cleanup": {"type": bool, "required": False},
     "auto_backup": {"type": bool, "required": False},
     "max_backups": {"type": int, "required": False, "min": 0, "max": 100},
-    "profile": {"type": str, "required": False, "choices": ["light", "advanced", "minimal"]},
+    "profile": {"type": str, "required": False, "choices": ("light", "advanced", "minimal")},
     "exportify_watch_folder": {"type": str, "required": False},
 
     "sync_write_tracks_json": {"type": bool, "required": False},
@@ -115,7 +129,7 @@ CONFIG_SCHEMA = {
 
     # Enhanced metadata validation
     "enable_metadata_embedding": {"type": bool, "required": False},
-    "metadata_template": {"type": str, "required": False, "choices": ["basic", "comprehensive", "dj-mix"]},
+    "metadata_template": {"type": str, "required": False, "choices": ("basic", "comprehensive", "dj-mix")},
     "auto_metadata_embedding": {"type": bool, "required": False},
     "enable_musicbrainz_lookup": {"type": bool, "required": False},
     "musicbrainz_rate_limit": {"type": bool, "required": False},
@@ -123,31 +137,172 @@ CONFIG_SCHEMA = {
     "musicbrainz_backoff_base": {"type": (int, float), "required": False, "min": 0.1, "max": 5.0},
 }
 
+# Read-only view of the rules above
+CONFIG_SCHEMA = MappingProxyType({key: MappingProxyType(rules) for key, rules in _SCHEMA_RULES.items()})
 
-def load_config() -> Dict[str, Any]:
-    """Load configuration from file, applying defaults for missing fields."""
-    if not os.path.exists(CONFIG_PATH):
+
+# Parsed config cache, invalidated when the file's mtime/size change
+_CONFIG_CACHE: Dict[str, Any] = {"path": None, "mtime": None, "size": None, "data": None}
+
+
+def invalidate_config_cache() -> None:
+    """Forget the cached config so the next load re-reads config.json."""
+    _CONFIG_CACHE.update(path=None, mtime=None, size=None, data=None)
+
+
+def _read_config_file() -> tuple[Dict[str, Any], os.stat_result]:
+    """Parse config.json from a single raw read, returning it with the stat of the file read.
+
+    Reads through os.open/os.read (no buffered text layer) and stats the open
+    descriptor, so the cached mtime/size always describe the bytes parsed even
+    if save_config() swaps the file in between.
+    """
+    fd = os.open(CONFIG_PATH, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        st = os.fstat(fd)
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(st.st_size, 4096))
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    raw = b"".join(chunks)
+    return (orjson.loads(raw) if orjson else json.loads(raw)), st
+
+
+def _load_config_cached() -> Dict[str, Any]:
+    """Return the shared parsed config, re-parsing only when the file changed.
+
+    Callers must not mutate the returned dict; use load_config() for a private copy.
+    """
+    try:
+        st = os.stat(CONFIG_PATH)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Config file {CONFIG_PATH} not found.")
 
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        config = json.load(f)
+    if (
+        _CONFIG_CACHE["data"] is not None
+        and _CONFIG_CACHE["path"] == CONFIG_PATH
+        and _CONFIG_CACHE["mtime"] == st.st_mtime_ns
+        and _CONFIG_CACHE["size"] == st.st_size
+    ):
+        return _CONFIG_CACHE["data"]
+
+    config, st = _read_config_file()
 
     # Apply defaults for missing fields
     for key, value in DEFAULT_CONFIG.items():
         if key not in config:
             config[key] = value
 
+    _CONFIG_CACHE.update(path=CONFIG_PATH, mtime=st.st_mtime_ns, size=st.st_size, data=config)
     return config
 
 
+def load_config() -> Dict[str, Any]:
+    """Load configuration from file, applying defaults for missing fields."""
+    return copy.deepcopy(_load_config_cached())
+
+
 def save_config(config: Dict[str, Any]) -> bool:
     """Save configuration to file."""
+    tmp_path = CONFIG_PATH + ".tmp"
+    if orjson:
+        data = orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    else:
+        data = (json.dumps(config, indent=2) + "\n").encode("utf-8")
     try:
-        with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=2)
+        # Write a complete copy first, then atomically swap it in: readers see either
+        # the old or the new file, never a truncated one.
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CONFIG_PATH)
         return True
     except Exception as e:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
         raise IOError(f"Failed to save config: {e}")
+    finally:
+        invalidate_config_cache()
+
+
+def _type_name(expected_type: Any) -> str:
+    if isinstance(expected_type, tuple):
+        return "/".join(t.__name__ for t in expected_type)
+    return expected_type.__name__
+
+
+def _compile_field_validator(key: str, rules: Mapping[str, Any]) -> Callable[[Any], list[str]]:
+    """Build a validator for one schema field with its rules bound up front.
+
+    Only the checks the field actually declares are included, so validating a
+    value never has to re-read the schema.
+    """
+    expected_type = rules.get("type")
+    type_name = _type_name(expected_type) if expected_type else ""
+    checks: list[Callable[[Any], Optional[str]]] = []
+
+    if "choices" in rules:
+        choices = list(rules["choices"])
+        choices_set = frozenset(choices)
+
+        def check_choices(value: Any) -> Optional[str]:
+            if value not in choices_set:
+                return f"Field '{key}' must be one of {choices}, got '{value}'"
+            return None
+
+        checks.append(check_choices)
+
+    if "min" in rules:
+        min_val = rules["min"]
+
+        def check_min(value: Any) -> Optional[str]:
+            if isinstance(value, (int, float)) and value < min_val:
+                return f"Field '{key}' must be >= {min_val}, got {value}"
+            return None
+
+        checks.append(check_min)
+
+    if "max" in rules:
+        max_val = rules["max"]
+
+        def check_max(value: Any) -> Optional[str]:
+            if isinstance(value, (int, float)) and value > max_val:
+                return f"Field '{key}' must be <= {max_val}, got {value}"
+            return None
+
+        checks.append(check_max)
+
+    def validate(value: Any) -> list[str]:
+        if expected_type and not isinstance(value, expected_type):
+            return [f"Field '{key}' must be {type_name}, got {type(value).__name__}"]
+        errors = []
+        for check in checks:
+            error = check(value)
+            if error:
+                errors.append(error)
+        return errors
+
+    return validate
+
+
+# CONFIG_SCHEMA compiled once at import: (key, required, validator)
+_VALIDATORS = tuple(
+    (key, rules.get("required", False), _compile_field_validator(key, rules))
+    for key, rules in CONFIG_SCHEMA.items()
+)
+_FIELD_VALIDATORS = {key: validator for key, _, validator in _VALIDATORS}
+
+
+def _validate_field(key: str, value: Any) -> list[str]:
+    """Validate a single field against its schema rules; returns a list of errors."""
+    return _FIELD_VALIDATORS[key](value)
 
 
 def validate_config(config: Dict[str, Any]) -> tuple[bool, list[str]]:
@@ -157,34 +312,14 @@ def validate_config(config: Dict[str, Any]) -> tuple[bool, list[str]]:
     """
     errors = []
 
-    for key, rules in CONFIG_SCHEMA.items():
-        # Check required fields
-        if rules.get("required", False) and key not in config:
-            errors.append(f"Missing required field: {key}")
-            continue
-
+    for key, required, validator in _VALIDATORS:
         if key not in config:
+            # Check required fields
+            if required:
+                errors.append(f"Missing required field: {key}")
             continue
 
-        value = config[key]
-
-        # Type check
-        expected_type = rules.get("type")
-        if expected_type and not isinstance(value, expected_type):
-            type_names = expected_type.__name__ if not isinstance(expected_type, tuple) else "/".join(t.__name__ for t in expected_type)
-            errors.append(f"Field '{key}' must be {type_names}, got {type(value).__name__}")
-            continue
-
-        # Choices check
-        if "choices" in rules and value not in rules["choices"]:
-            errors.append(f"Field '{key}' must be one of {rules['choices']}, got '{value}'")
-
-        # Range check for numeric values
-        if isinstance(value, (int, float)):
-            if "min" in rules and value < rules["min"]:
-                errors.append(f"Field '{key}' must be >= {rules['min']}, got {value}")
-            if "max" in rules and value > rules["max"]:
-                errors.append(f"Field '{key}' must be <= {rules['max']}, got {value}")
+        errors.extend(validator(config[key]))
 
     return len(errors) == 0, errors
 
@@ -194,22 +329,17 @@ def update_config(key: str, value: Any) -> tuple[bool, str]:
     Update a single config field with validation.
     Returns (success, message).
     """
-    config = load_config()
-
     # Check if key is valid
     if key not in CONFIG_SCHEMA:
         return False, f"Unknown config key: {key}"
 
-    # Create temporary config with new value
-    test_config = config.copy()
-    test_config[key] = value
-
-    # Validate the change
-    is_valid, errors = validate_config(test_config)
-    if not is_valid:
+    # Only the changed field needs validating; there are no cross-field rules.
+    errors = _validate_field(key, value)
+    if errors:
         return False, f"Validation failed: {', '.join(errors)}"
 
     # Save the updated config
+    config = load_config()
     config[key] = value
     save_config(config)
 
@@ -221,6 +351,28 @@ def get_config_profile(config: Dict[str, Any]) -> str:
     return config.get("profile", "light")
 
 
+@contextmanager
+def batched_config_updates() -> Iterator[Dict[str, Any]]:
+    """
+    Apply several config changes with a single load, validation and write.
+
+    Usage:
+        with batched_config_updates() as cfg:
+            cfg["retry_attempts"] = 5
+            cfg["retry_delay"] = 10
+
+    Raises ValueError (nothing is written) if the result fails validation.
+    """
+    config = load_config()
+    yield config
+
+    is_valid, errors = validate_config(config)
+    if not is_valid:
+        raise ValueError(", ".join(errors))
+
+    save_config(config)
+
+
 def apply_config_profile(profile_name: str) -> tuple[bool, str]:
     """
     Apply a configuration profile, updating relevant settings.
@@ -229,38 +381,30 @@ def apply_config_profile(profile_name: str) -> tuple[bool, str]:
     if profile_name not in CONFIG_PROFILES:
         return False, f"Unknown profile: {profile_name}. Available: {list(CONFIG_PROFILES.keys())}"
 
-    config = load_config()
-    profile_settings = CONFIG_PROFILES[profile_name]
-
-    # Apply profile settings
-    for key, value in profile_settings.items():
-        config[key] = value
-
-    config["profile"] = profile_name
-
-    # Validate and save
-    is_valid, errors = validate_config(config)
-    if not is_valid:
-        return False, f"Profile validation failed: {', '.join(errors)}"
+    try:
+        with batched_config_updates() as config:
+            config.update(CONFIG_PROFILES[profile_name])
+            config["profile"] = profile_name
+    except ValueError as e:
+        return False, f"Profile validation failed: {e}"
 
-    save_config(config)
     return True, f"Applied profile '{profile_name}' successfully"
 
 
-def get_profile_info(profile_name: str) -> Optional[Dict[str, Any]]:
+def get_profile_info(profile_name: str) -> Optional[Mapping[str, Any]]:
     """Get settings for a specific profile."""
     return CONFIG_PROFILES.get(profile_name)
 
 
-def list_profiles() -> Dict[str, Dict[str, Any]]:
-    """Return all available profiles and their settings."""
-    return CONFIG_PROFILES.copy()
+def list_profiles() -> Mapping[str, Mapping[str, Any]]:
+    """Return all available profiles and their settings (read-only)."""
+    return CONFIG_PROFILES
 
 
 def reset_to_defaults() -> tuple[bool, str]:
     """Reset configuration to default values."""
     try:
-        save_config(DEFAULT_CONFIG.copy())
+        save_config(dict(DEFAULT_CONFIG))
         return True, "Configuration reset to defaults"
     except Exception as e:
         return False, f"Failed to reset config: {e}"
@@ -269,7 +413,7 @@ def reset_to_defaults() -> tuple[bool, str]:
 def get_config_value(key: str, default: Any = None) -> Any:
     """Get a single config value with optional default."""
     try:
-        config = load_config()
-        return config.get(key, default)
+        value = _load_config_cached().get(key, default)
+        return copy.deepcopy(value)
     except Exception:
         return default
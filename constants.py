@@ -12,7 +12,7 @@ SYSTEM_DEPENDENCIES = [
 
 # Audio Related
 
-VALID_AUDIO_EXTENSIONS = {".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a"}
+VALID_AUDIO_EXTENSIONS = frozenset({".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a"})
 
 AUDIO_BITRATE_OPTIONS = {
     "64k": "Very low quality (speech/podcasts)",
@@ -27,5 +27,9 @@ AUDIO_BITRATE_OPTIONS = {
 # Files
 
 FAILED_FILE = "data/failed_downloads.json"
+FAILED_FILE_JSONL = "data/failed_downloads.jsonl"  # append-only log of new failures
 PROGRESS_FILE = "data/download_progress.json"
+YTDLP_CACHE_DIR = "data/yt-dlp-cache"
+MB_CACHE_FILE = "data/musicbrainz_cache.sqlite"
+EXISTING_KEYS_CACHE_FILE = "data/existing_keys_cache.pickle"  # {"format", "entries": {folder: (mtime_ns, scanned_at_ns, track keys)}}
 LOG_FILE = "app.log"
\ No newline at end of file
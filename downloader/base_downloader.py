@@ -1,10 +1,37 @@
 import os
+import re
 import subprocess
+import tempfile
+import threading
 import time
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import math
+from dataclasses import dataclass
+from typing import Optional
 from utils import log_info, log_success, log_error, log_warning
 from tqdm import tqdm
+from constants import VALID_AUDIO_EXTENSIONS, YTDLP_CACHE_DIR
+
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None  # fall back to the yt-dlp executable
+
+# Optional post-download helpers, resolved once; None when unavailable.
+try:
+    from downloader.metadata import embed_track_metadata, find_downloaded_audio_path, embed_metadata, prefetch_musicbrainz
+except ImportError:
+    embed_track_metadata = find_downloaded_audio_path = embed_metadata = prefetch_musicbrainz = None
+
+try:
+    from managers.backup_manager import backup_all
+except ImportError:
+    backup_all = None
+
+try:
+    from managers.cleanup_manager import cleanup_after_download
+except ImportError:
+    cleanup_after_download = None
 
 
 def _get_base_filename(artist: str, track: str) -> str:
@@ -13,125 +40,365 @@ def _get_base_filename(artist: str, track: str) -> str:
     return query.replace("/", "-")
 
 
+def _output_template(output_dir: str, filename: str) -> str:
+    """yt-dlp output template for a literal base filename."""
+    return os.path.join(output_dir, f"{filename.replace('%', '%%')}.%(ext)s")
+
+
+def _build_ytdlp_cmd(query: str, output_dir: str, filename: str, audio_format: str) -> list:
+    """Command line for downloading a single search result with the yt-dlp executable."""
+    return [
+        "yt-dlp",
+        f"ytsearch1:{query}",
+        "-x",
+        "--audio-format", audio_format,
+        "--cache-dir", YTDLP_CACHE_DIR,
+        "-o", _output_template(output_dir, filename),
+    ]
+
+
+# Maximum number of search queries handed to one yt-dlp process in batch mode.
+BATCH_CHUNK_SIZE = 64
+
+
+def _batch_search_url(query: str) -> str:
+    """
+    ytsearch1: URL for query that yt-dlp's batch-file parser reads back unchanged.
+
+    read_batch_urls strips each line and cuts it at whitespace followed by '#',
+    so whitespace is collapsed and those '#'s dropped ("Primadonna #2" searches
+    "Primadonna 2"). The URL is what the batch output is matched back on.
+    """
+    return "ytsearch1:" + " ".join(re.sub(r"(^|\s)#+", " ", query).split())
+
+
+def _build_ytdlp_batch_cmd(batch_file: str, output_dir: str, audio_format: str) -> list:
+    """Command line for downloading the search URLs listed in batch_file in one yt-dlp run.
+
+    Files are saved under their video id; for every finished file yt-dlp prints
+    "<search url>\t<final path>" (UTF-8) so the caller can map it back to its track.
+    """
+    return [
+        "yt-dlp",
+        "--batch-file", batch_file,
+        "--encoding", "utf-8",
+        "--ignore-errors",
+        "-x",
+        "--audio-format", audio_format,
+        "--cache-dir", YTDLP_CACHE_DIR,
+        "-o", os.path.join(output_dir, "%(id)s.%(ext)s"),
+        "--print", "after_move:%(original_url)s\t%(filepath)s",
+    ]
+
+
+def _chunk_tracks(tracks: list, max_workers: int) -> list:
+    """Split tracks into at most BATCH_CHUNK_SIZE-sized chunks, spread across max_workers."""
+    size = max(1, min(BATCH_CHUNK_SIZE, math.ceil(len(tracks) / max(1, max_workers))))
+    return [tracks[i:i + size] for i in range(0, len(tracks), size)]
+
+
+# One YoutubeDL per thread: instances are not thread-safe, but reusing them
+# avoids paying interpreter start-up and extractor initialisation per track.
+_ydl_local = threading.local()
+
+
+def _get_ydl(audio_format: str):
+    """Return this thread's YoutubeDL instance for the given audio format."""
+    ydl = getattr(_ydl_local, "ydl", None)
+    if ydl is None or _ydl_local.audio_format != audio_format:
+        ydl = yt_dlp.YoutubeDL({
+            "format": "bestaudio/best",
+            "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": audio_format}],
+            "outtmpl": {"default": "%(title)s.%(ext)s"},
+            "cachedir": YTDLP_CACHE_DIR,
+            "quiet": True,
+            "no_warnings": True,
+            "noprogress": True,
+        })
+        _ydl_local.ydl = ydl
+        _ydl_local.audio_format = audio_format
+    return ydl
+
+
+def _download_in_process(query: str, output_dir: str, filename: str, audio_format: str) -> Optional[str]:
+    """Download the first search result for query in-process; returns the final audio path.
+
+    Raises yt_dlp.utils.DownloadError on failure.
+    """
+    ydl = _get_ydl(audio_format)
+    ydl.params["outtmpl"]["default"] = _output_template(output_dir, filename)
+    info = ydl.extract_info(f"ytsearch1:{query}", download=True)
+
+    entries = (info or {}).get("entries") or [info or {}]
+    downloads = (entries[0] or {}).get("requested_downloads") or []
+    return downloads[0].get("filepath") if downloads else None
+
+
+@dataclass(frozen=True)
+class _MetaOpts:
+    """Metadata settings read from config once per download session."""
+    enabled: bool
+    template: str
+    musicbrainz: bool
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "_MetaOpts":
+        config = config or {}
+        return cls(
+            enabled=config.get("enable_metadata_embedding", True),
+            template=config.get("metadata_template", "basic"),
+            musicbrainz=config.get("enable_musicbrainz_lookup", True),
+        )
+
+
+@dataclass(frozen=True)
+class _PostDownloadOpts:
+    """Post-batch housekeeping switches read from config once per batch."""
+    backup: bool
+    cleanup: bool
+    embed_all: bool
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "_PostDownloadOpts":
+        if not config:
+            return cls(backup=False, cleanup=False, embed_all=False)
+        return cls(
+            backup=config.get("auto_backup", True) and backup_all is not None,
+            cleanup=config.get("auto_cleanup", True) and cleanup_after_download is not None,
+            embed_all=(
+                config.get("auto_metadata_embedding", True)
+                and config.get("enable_metadata_embedding", True)
+                and embed_metadata is not None
+            ),
+        )
+
+
 def _embed_metadata_after_download(
     audio_path: str,
     track: dict,
-    config: dict,
+    opts: _MetaOpts,
 ) -> bool:
     """Embed metadata into downloaded audio file after successful download."""
+    if not opts.enabled:
+        return True
+
+    if embed_track_metadata is None:
+        log_warning("Metadata embedding module not available, skipping metadata embedding")
+        return True
+
     try:
-        from downloader.metadata import embed_track_metadata
-        
-        # Check if metadata embedding is enabled
-        if not config.get("enable_metadata_embedding", True):
-            return True
-        
-        # Get metadata template and options
-        template = config.get("metadata_template", "basic")
-        enable_musicbrainz = config.get("enable_musicbrainz_lookup", True)
-        
-        # Embed metadata
         return embed_track_metadata(
             audio_path,
             track,
-            template=template,
-            allow_musicbrainz=enable_musicbrainz,
+            template=opts.template,
+            allow_musicbrainz=opts.musicbrainz,
         )
-    except ImportError:
-        log_warning("Metadata embedding module not available, skipping metadata embedding")
-        return True
     except Exception as e:
-        log_error(f"Metadata embedding failed for {audio_path}: {e}")
+        log_error("Metadata embedding failed for %s: %s", audio_path, e)
         return False
 
 
-def download_track(artist, track, output_dir, audio_format, sleep_between, config=None):
+def _record_failure(artist, track, error=None):
+    """Append a failed track to the retry list; a failure to record it must not abort the download run."""
+    # Imported here: retry_manager itself imports download_track from this module
+    from downloader.retry_manager import add_failed_track
+
+    try:
+        add_failed_track(artist, track, error)
+    except OSError as e:
+        log_warning(f"Could not record failed download {artist} - {track}: {e}")
+
+
+def download_track(artist, track, output_dir, audio_format, sleep_between, config=None, record_failure=True):
+    """
+    Download one track; returns True on success, False if yt-dlp failed.
+
+    Failures are appended to the retry list unless record_failure is False
+    (the retry manager passes that: it tracks its own attempts).
+    """
     query = f"{artist} - {track}"
     filename = _get_base_filename(artist, track)
 
-    log_info(f"Starting download: {query}")
-    cmd = [
-        "yt-dlp",
-        f"ytsearch1:{query}",
-        "-x",
-        "--audio-format", audio_format,
-        "-o", os.path.join(output_dir, f"{filename}.%(ext)s")
-    ]
+    log_info("Starting download: %s", query)
 
     try:
-        process = subprocess.Popen(cmd)
-        process.wait()
-        if process.returncode == 0:
-            log_success(f"Downloaded successfully: {query}")
+        audio_path = None
+        if yt_dlp is not None:
+            audio_path = _download_in_process(query, output_dir, filename, audio_format)
+            success = True
+        else:
+            process = subprocess.Popen(_build_ytdlp_cmd(query, output_dir, filename, audio_format))
+            process.wait()
+            success = process.returncode == 0
+
+        if success:
+            log_success("Downloaded successfully: %s", query)
             
             # Try to find the downloaded audio file and embed metadata
             try:
-                from downloader.metadata import find_downloaded_audio_path
-                audio_path = find_downloaded_audio_path(output_dir, filename)
+                if not audio_path and find_downloaded_audio_path is not None:
+                    audio_path = find_downloaded_audio_path(output_dir, filename)
                 if audio_path:
                     track_data = {"artist": artist, "track": track}
-                    metadata_success = _embed_metadata_after_download(audio_path, track_data, config or {})
+                    metadata_success = _embed_metadata_after_download(audio_path, track_data, _MetaOpts.from_config(config))
                     if metadata_success:
-                        log_info(f"Metadata embedded for {query}")
+                        log_info("Metadata embedded for %s", query)
                     else:
-                        log_warning(f"Metadata embedding failed for {query}")
+                        log_warning("Metadata embedding failed for %s", query)
                 else:
                     log_warning(f"Could not find downloaded audio file for metadata embedding: {filename}")
             except Exception as e:
                 log_warning(f"Metadata embedding step failed: {e}")
         else:
-            log_error(f"Failed to download: {query}")
+            log_error("Failed to download: %s", query)
+            if record_failure:
+                _record_failure(artist, track, f"yt-dlp exited with code {process.returncode}")
     except Exception as e:
-        log_error(f"Error downloading {query}: {e}")
+        log_error("Error downloading %s: %s", query, e)
+        success = False
+        if record_failure:
+            _record_failure(artist, track, str(e))
 
     time.sleep(sleep_between)
+    return success
 
 
-# Worker function for a single track
-def _download_worker(artist, track, output_dir, audio_format, config=None):
+def _remove_quietly(path: str):
+    """Delete path if it exists (an orphaned <id>.<ext> download or a spent batch file)."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _finish_batch_download(artist, track, downloaded_path, output_dir, opts) -> bool:
+    """
+    Rename a batch-downloaded file to 'Artist - Track.ext' and embed its metadata (blocking).
+
+    Returns False (and removes the id-named file) if the rename failed.
+    """
     query = f"{artist} - {track}"
-    filename = _get_base_filename(artist, track)
+    ext = os.path.splitext(downloaded_path)[1]
+    audio_path = os.path.join(output_dir, _get_base_filename(artist, track) + ext)
+    try:
+        os.replace(downloaded_path, audio_path)
+    except OSError as e:
+        log_warning("Could not rename downloaded file for %s: %s", query, e)
+        _remove_quietly(downloaded_path)
+        return False
 
-    cmd = [
-        "yt-dlp",
-        f"ytsearch1:{query}",
-        "-x",
-        "--audio-format", audio_format,
-        "-o", os.path.join(output_dir, f"{filename}.%(ext)s")
-    ]
+    try:
+        track_data = {"artist": artist, "track": track}
+        metadata_success = _embed_metadata_after_download(audio_path, track_data, opts)
+        if not metadata_success:
+            log_warning("Metadata embedding failed for %s", query)
+    except Exception as e:
+        log_warning(f"Metadata embedding step failed: {e}")
+    return True
+
+
+# Worker coroutine for a chunk of tracks, downloaded by a single yt-dlp process.
+# Each chunk item is (artist, track, future); the future is resolved with True/False
+# once that track has finished so batch_download can report progress.
+async def _download_chunk(chunk, output_dir, audio_format, sem, opts):
+    # Keyed by the exact search URL yt-dlp echoes back as %(original_url)s.
+    # batch_download dedupes target filenames; setdefault keeps the first of
+    # any two tracks whose queries still collapse to the same URL.
+    pending = {}
+    waiters = {}
+    for artist, track, done in chunk:
+        url = _batch_search_url(f"{artist} - {track}")
+        if url in pending:
+            done.set_result(False)
+            _record_failure(artist, track, "same search query as another track in the batch")
+            continue
+        pending[url] = (artist, track)
+        waiters[url] = done
+
+    def resolve(url, ok):
+        done = waiters.pop(url, None)
+        if done is not None and not done.done():
+            done.set_result(ok)
+
+    async def finish(url, track, downloaded_path):
+        # Renaming and tagging are blocking file (and possibly network) I/O; keep them off the event loop.
+        ok = False
+        try:
+            ok = await asyncio.to_thread(_finish_batch_download, track[0], track[1], downloaded_path, output_dir, opts)
+        finally:
+            resolve(url, ok)
+        if not ok:
+            _record_failure(track[0], track[1], "could not rename the downloaded file")
+
+    stderr = b""
+    finishing = []
+    batch_file = None
 
     try:
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        stdout, stderr = process.communicate()
-        
-        if process.returncode == 0:
-            log_success(f"Downloaded: {query}")
-            
-            # Try to find the downloaded audio file and embed metadata
+        async with sem:
             try:
-                from downloader.metadata import find_downloaded_audio_path
-                audio_path = find_downloaded_audio_path(output_dir, filename)
-                if audio_path:
-                    track_data = {"artist": artist, "track": track}
-                    metadata_success = _embed_metadata_after_download(audio_path, track_data, config or {})
-                    if not metadata_success:
-                        log_warning(f"Metadata embedding failed for {query}")
-                else:
-                    log_warning(f"Could not find downloaded audio file for metadata embedding: {filename}")
+                # A UTF-8 file rather than stdin: yt-dlp decodes stdin with the
+                # locale encoding, which mangles non-ASCII queries on Windows
+                with tempfile.NamedTemporaryFile(
+                    "w", encoding="utf-8", suffix=".txt", prefix="yt-dlp-batch-", delete=False
+                ) as f:
+                    f.write("".join(f"{url}\n" for url in pending))
+                    batch_file = f.name
+
+                process = await asyncio.create_subprocess_exec(
+                    *_build_ytdlp_batch_cmd(batch_file, output_dir, audio_format),
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                stderr_task = asyncio.ensure_future(process.stderr.read())
+
+                async for raw_line in process.stdout:
+                    url, sep, downloaded_path = raw_line.decode("utf-8", errors="replace").rstrip("\r\n").partition("\t")
+                    if not sep:
+                        continue
+                    track = pending.pop(url, None)
+                    if track is None:
+                        # Can't tell which track this is; don't leave <id>.<ext> behind
+                        log_warning("Unmatched yt-dlp result: %s", url)
+                        await asyncio.to_thread(_remove_quietly, downloaded_path)
+                        continue
+
+                    log_success("Downloaded: %s - %s", *track)
+                    # Tag in the background so MusicBrainz waits for one track overlap
+                    # with tag writes for others and with reading further yt-dlp output.
+                    finishing.append(asyncio.ensure_future(finish(url, track, downloaded_path)))
+
+                await process.wait()
+                stderr = await stderr_task
             except Exception as e:
-                log_warning(f"Metadata embedding step failed: {e}")
-        else:
-            log_error(f"Failed: {query}")
-            if stderr:
-                log_error(f"Error details: {stderr.strip()}")
-    except Exception as e:
-        log_error(f"Error downloading {query}: {e}")
+                log_error(f"Error running yt-dlp batch: {e}")
+
+        # Outside the semaphore: the next chunk's yt-dlp can start while these finish.
+        await asyncio.gather(*finishing)
+
+        details = stderr.decode("utf-8", errors="replace").strip()
+        # stderr covers the whole chunk; its last line is usually the final error
+        last_error = details.rsplit("\n", 1)[-1] if details else None
+        for artist, track in pending.values():
+            log_error("Failed: %s - %s", artist, track)
+            _record_failure(artist, track, last_error)
+        if pending and details:
+            log_error(f"Error details: {details}")
+    finally:
+        if batch_file is not None:
+            _remove_quietly(batch_file)
+        for url in list(waiters):
+            resolve(url, False)
 
 
 # Async batch downloader
-async def batch_download(tracks, output_dir, audio_format, max_workers=4, config=None):
+async def batch_download(tracks, output_dir, audio_format, max_workers=4, config=None, sem=None):
     """
     Download multiple tracks concurrently.
+
+    Tracks are split into chunks of up to BATCH_CHUNK_SIZE; each chunk is fed to one
+    yt-dlp process so start-up cost is paid per chunk rather than per track.
     
     Args:
         tracks: List of track dicts with 'artist' and 'track' keys
@@ -139,57 +406,95 @@ async def batch_download(tracks, output_dir, audio_format, max_workers=4, config
         audio_format: Audio format (mp3, flac, etc.)
         max_workers: Maximum concurrent downloads
         config: Optional config dict for auto-cleanup and backup
+        sem: Optional asyncio.Semaphore shared by batches running side by side,
+            so their combined yt-dlp processes stay within one budget
     """
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        tasks = []
-        with tqdm(total=len(tracks), desc="Downloading", unit="track") as pbar:
-            for track in tracks:
-                artist = track["artist"].strip()
-                song = track["track"].strip()
-                task = loop.run_in_executor(executor, _download_worker, artist, song, output_dir, audio_format, config)
-                task.add_done_callback(lambda _: pbar.update(1))
-                tasks.append(task)
-            await asyncio.gather(*tasks)
+    # Merged playlists often repeat tracks; keep the first entry per target filename.
+    unique = {}
+    for t in tracks:
+        artist, track = t["artist"].strip(), t["track"].strip()
+        unique.setdefault(_get_base_filename(artist, track), (artist, track))
+    if len(unique) < len(tracks):
+        log_info(f"Skipped {len(tracks) - len(unique)} duplicate track(s)")
+
+    # One directory listing instead of a stat per track; re-runs of a playlist skip finished files.
+    # Matched on the stem: yt-dlp's extension needn't equal audio_format (aac is saved as .m4a).
+    try:
+        with os.scandir(output_dir) as entries:
+            existing = {
+                stem
+                for stem, ext in (os.path.splitext(entry.name) for entry in entries)
+                if ext.lower() in VALID_AUDIO_EXTENSIONS
+            }
+    except FileNotFoundError:
+        existing = set()
+    remaining = {k: v for k, v in unique.items() if k not in existing}
+    if len(remaining) < len(unique):
+        log_info(f"Skipped {len(unique) - len(remaining)} already downloaded track(s)")
+    unique = remaining
+
+    loop = asyncio.get_running_loop()
+    items = [(artist, track, loop.create_future()) for artist, track in unique.values()]
+    opts = _MetaOpts.from_config(config)
+    post = _PostDownloadOpts.from_config(config)
+    # Shared across all yt-dlp runs so extractor/signature data is reused between processes.
+    os.makedirs(YTDLP_CACHE_DIR, exist_ok=True)
+    if sem is None:
+        sem = asyncio.Semaphore(max_workers)
+
+    # Batched MusicBrainz lookups run alongside the downloads, so per-track
+    # metadata embedding mostly finds its match already cached.
+    prefetch = None
+    if items and opts.enabled and opts.musicbrainz and prefetch_musicbrainz is not None:
+        prefetch = asyncio.ensure_future(asyncio.to_thread(
+            prefetch_musicbrainz,
+            [{"artist": artist, "track": track} for artist, track, _ in items],
+            config,
+        ))
+
+    workers = asyncio.gather(*[
+        _download_chunk(chunk, output_dir, audio_format, sem, opts)
+        for chunk in _chunk_tracks(items, max_workers)
+    ])
+    with tqdm(total=len(items), desc="Downloading", unit="track") as pbar:
+        for done in asyncio.as_completed([item[2] for item in items]):
+            await done
+            pbar.update(1)
+    await workers
+    if prefetch is not None:
+        try:
+            await prefetch
+        except Exception as e:
+            log_warning(f"MusicBrainz prefetch failed: {e}")
     
-    # Post-download operations if config is provided
-    if config:
-        # Auto-backup data files
-        if config.get("auto_backup", True):
-            try:
-                from managers.backup_manager import backup_all
-                log_info("Creating backups of data files...")
-                backup_all(config)
-            except ImportError:
-                pass
-            except Exception as e:
-                log_error(f"Backup failed: {e}")
-        
-        # Auto-cleanup
-        if config.get("auto_cleanup", True):
-            try:
-                from managers.cleanup_manager import cleanup_after_download
-                log_info("Running post-download cleanup...")
-                cleanup_results = cleanup_after_download(config)
-                total_cleaned = (
-                    cleanup_results.get("temp_files_removed", 0) +
-                    cleanup_results.get("empty_dirs_removed", 0) +
-                    cleanup_results.get("partial_files_removed", 0)
-                )
-                if total_cleaned > 0:
-                    log_info(f"Cleaned up {total_cleaned} items")
-            except ImportError:
-                pass
-            except Exception as e:
-                log_error(f"Cleanup failed: {e}")
-                
-        # Auto-metadata embedding for all downloaded files (legacy batch mode)
-        if config.get("auto_metadata_embedding", True) and config.get("enable_metadata_embedding", True):
-            try:
-                from downloader.metadata import embed_metadata
-                log_info("Embedding metadata in all downloaded files...")
-                embed_metadata(output_dir)
-            except ImportError:
-                pass
-            except Exception as e:
-                log_error(f"Auto metadata embedding failed: {e}")
+    # Post-download operations (all disabled when no config is provided)
+    # Auto-backup data files
+    if post.backup:
+        try:
+            log_info("Creating backups of data files...")
+            backup_all(config)
+        except Exception as e:
+            log_error(f"Backup failed: {e}")
+    
+    # Auto-cleanup
+    if post.cleanup:
+        try:
+            log_info("Running post-download cleanup...")
+            cleanup_results = cleanup_after_download(config)
+            total_cleaned = (
+                cleanup_results.get("temp_files_removed", 0) +
+                cleanup_results.get("empty_dirs_removed", 0) +
+                cleanup_results.get("partial_files_removed", 0)
+            )
+            if total_cleaned > 0:
+                log_info(f"Cleaned up {total_cleaned} items")
+        except Exception as e:
+            log_error(f"Cleanup failed: {e}")
+            
+    # Auto-metadata embedding for all downloaded files (legacy batch mode)
+    if post.embed_all:
+        try:
+            log_info("Embedding metadata in all downloaded files...")
+            embed_metadata(output_dir)
+        except Exception as e:
+            log_error(f"Auto metadata embedding failed: {e}")
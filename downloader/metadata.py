@@ -3,15 +3,24 @@ import json
 import time 
 import urllib.parse 
 import urllib.request 
+import http.client
 import socket
 import random
-from dataclasses import dataclass
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from functools import lru_cache 
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
 
 from mutagen import File as MutagenFile 
 from mutagen.easyid3 import EasyID3 
-from mutagen.id3 import ID3, APIC, ID3NoHeaderError 
+from mutagen.id3 import ID3, APIC, COMM, TALB, TBPM, TCON, TDRC, TIT2, TPE1, ID3NoHeaderError 
 from mutagen.flac import FLAC, Picture 
 from mutagen.mp4 import MP4, MP4Cover 
 from mutagen.oggvorbis import OggVorbis 
@@ -20,7 +29,7 @@ from mutagen.aac import AAC
 from mutagen.wave import WAVE
 
 from utils.logger import log_info, log_warning, log_error
-from constants import VALID_AUDIO_EXTENSIONS
+from constants import MB_CACHE_FILE, VALID_AUDIO_EXTENSIONS
 
 
 # -----------------------------
@@ -70,6 +79,18 @@ METADATA_TEMPLATES: Dict[str, Dict[str, Any]] = {
 }
 
 
+# Per-template tags to emit (artist/title always carried) and cover-art switch, resolved once.
+_TEMPLATE_EMIT_KEYS: Dict[str, Tuple[str, ...]] = {
+    name: ("artist", "title") + tuple(
+        k for k in ("album", "date", "genre", "bpm", "comment") if tpl["fields"].get(k)
+    )
+    for name, tpl in METADATA_TEMPLATES.items()
+}
+_TEMPLATE_EMBED_COVER: Dict[str, bool] = {
+    name: bool(tpl.get("embed_cover_art")) for name, tpl in METADATA_TEMPLATES.items()
+}
+
+
 def get_metadata_template(name: Optional[str]) -> Dict[str, Any]:
     if not name:
         return METADATA_TEMPLATES["basic"]
@@ -82,6 +103,8 @@ def get_metadata_template(name: Optional[str]) -> Dict[str, Any]:
 
 
 def _as_str(v: Any) -> str:
+    if type(v) is str:
+        return v.strip()
     if v is None:
         return ""
     if isinstance(v, (list, tuple)):
@@ -151,12 +174,15 @@ def normalize_track_metadata(track: Dict[str, Any]) -> Dict[str, Any]:
     comment_parts = []
     if uri:
         comment_parts.append(f"spotify_uri={uri}")
-    if _as_str(track.get("record_label") or track.get("Record Label")):
-        comment_parts.append(f"label={_as_str(track.get('record_label') or track.get('Record Label'))}")
-    if _as_str(track.get("key") or track.get("Key")):
-        comment_parts.append(f"key={_as_str(track.get('key') or track.get('Key'))}")
-    if _as_str(track.get("energy") or track.get("Energy")):
-        comment_parts.append(f"energy={_as_str(track.get('energy') or track.get('Energy'))}")
+    label = _as_str(track.get("record_label") or track.get("Record Label"))
+    if label:
+        comment_parts.append(f"label={label}")
+    key = _as_str(track.get("key") or track.get("Key"))
+    if key:
+        comment_parts.append(f"key={key}")
+    energy = _as_str(track.get("energy") or track.get("Energy"))
+    if energy:
+        comment_parts.append(f"energy={energy}")
 
     out: Dict[str, Any] = {
         "artist": artist,
@@ -242,19 +268,35 @@ def correct_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
     return fixed
 
 
+def _normalize_corrected(track: Dict[str, Any]) -> Dict[str, Any]:
+    """Same result as correct_metadata(normalize_track_metadata(track)), without the second pass.
+
+    normalize_track_metadata already emits stripped strings and an integer BPM string,
+    so the only correction left to apply is dropping an empty album.
+    """
+    meta = normalize_track_metadata(track)
+    if not meta["album"]:
+        del meta["album"]
+    return meta
+
+
+def normalize_tracks_bulk(tracks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Normalize and correct many tracks at once (same result as per-track calls).
+
+    Convenience for bulk callers such as CSV imports and MusicBrainz prefetch.
+    """
+    return [_normalize_corrected(track) for track in tracks]
+
+
 def apply_template(metadata: Dict[str, Any], template_name: Optional[str]) -> Dict[str, Any]:
-    tpl = get_metadata_template(template_name)
-    fields = (tpl.get("fields") or {})
+    keys = _TEMPLATE_EMIT_KEYS.get(template_name or "basic", _TEMPLATE_EMIT_KEYS["basic"])
 
-    # Always carry required fields if present.
+    # Required fields first, then whatever the template enables; empty values are skipped.
     out = {}
-    for key in ["artist", "title"]:
-        if _as_str(metadata.get(key)):
-            out[key] = _as_str(metadata.get(key))
-
-    for key in ["album", "date", "genre", "bpm", "comment"]:
-        if fields.get(key) and _as_str(metadata.get(key)):
-            out[key] = _as_str(metadata.get(key))
+    for key in keys:
+        value = _as_str(metadata.get(key))
+        if value:
+            out[key] = value
 
     # pass-through for cover art decisions and provenance
     out["uri"] = _as_str(metadata.get("uri"))
@@ -275,6 +317,9 @@ MB_RATE_LIMIT_SECONDS = 1.05  # MusicBrainz asks for 1 req/sec
 
 @dataclass(frozen=True)
 class MusicBrainzMatch:
+    # Explicit __slots__ (dataclass(slots=True) needs Python 3.10): no per-instance __dict__.
+    __slots__ = ("recording_mbid", "release_mbid", "title", "artist", "album", "date")
+
     recording_mbid: str
     release_mbid: Optional[str]
     title: str
@@ -283,7 +328,78 @@ class MusicBrainzMatch:
     date: Optional[str]
 
 
-_last_mb_request_at = 0.0
+class _TokenBucket:
+    """Thread-safe pacing: hands out one request slot every `interval` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_ok = 0.0
+
+    def acquire(self) -> None:
+        # Reserve a slot under the lock, sleep outside it so other threads can queue up.
+        with self.lock:
+            now = time.monotonic()
+            wait = max(0.0, self.next_ok - now)
+            self.next_ok = max(self.next_ok, now) + self.interval
+        if wait:
+            time.sleep(wait)
+
+
+# Shared by every thread so MusicBrainz sees at most one request per MB_RATE_LIMIT_SECONDS.
+_mb_bucket = _TokenBucket(MB_RATE_LIMIT_SECONDS)
+
+# Keep-alive HTTPS connections, one per host per thread, so consecutive lookups
+# skip the TCP/TLS handshake.
+_mb_local = threading.local()
+
+
+def _mb_connection(host: str, timeout: float) -> http.client.HTTPSConnection:
+    conns = getattr(_mb_local, "conns", None)
+    if conns is None:
+        conns = _mb_local.conns = {}
+    conn = conns.get(host)
+    if conn is None:
+        conn = conns[host] = http.client.HTTPSConnection(host, timeout=timeout)
+    else:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+    return conn
+
+
+def _mb_drop_connection(host: str) -> None:
+    conn = getattr(_mb_local, "conns", {}).pop(host, None)
+    if conn is not None:
+        conn.close()
+
+
+def _mb_fetch(url: str, timeout: float) -> bytes:
+    """GET url over a reused connection; raises urllib.error.HTTPError on 4xx/5xx."""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    conn = _mb_connection(parts.netloc, timeout)
+    try:
+        conn.request(
+            "GET",
+            path,
+            headers={
+                "User-Agent": MB_USER_AGENT,
+                "Accept": "application/json",
+            },
+        )
+        resp = conn.getresponse()
+        raw = resp.read()
+    except Exception:
+        # The socket is in an unknown state; the next attempt opens a fresh one.
+        _mb_drop_connection(parts.netloc)
+        raise
+
+    if resp.will_close:
+        _mb_drop_connection(parts.netloc)
+    if resp.status >= 400:
+        raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+    return raw
 
 
 def _mb_get_json(url: str, timeout: int = 15, max_retries: int = 3, base_delay: float = 0.75) -> Optional[Dict[str, Any]]:
@@ -298,32 +414,16 @@ def _mb_get_json(url: str, timeout: int = 15, max_retries: int = 3, base_delay:
     Returns:
         Parsed JSON data or None if all attempts fail
     """
-    global _last_mb_request_at
     last_error = None
     
     for attempt in range(max_retries + 1):
         try:
             # Rate limiting - ensure we don't exceed MusicBrainz limits
-            now = time.time()
-            wait = MB_RATE_LIMIT_SECONDS - (now - _last_mb_request_at)
-            if wait > 0:
-                time.sleep(wait)
-            
-            # Create request with proper headers
-            req = urllib.request.Request(
-                url, 
-                headers={
-                    "User-Agent": MB_USER_AGENT,
-                    "Accept": "application/json",
-                }
-            )
+            _mb_bucket.acquire()
             
             # Make the request with timeout
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
-                raw = resp.read()
-                data = json.loads(raw.decode("utf-8"))
-            
-            _last_mb_request_at = time.time()
+            raw = _mb_fetch(url, timeout)
+            data = orjson.loads(raw) if orjson else json.loads(raw)
             return data
             
         except (urllib.error.URLError, socket.error, ConnectionResetError) as e:
@@ -378,45 +478,91 @@ def _mb_get_json(url: str, timeout: int = 15, max_retries: int = 3, base_delay:
     return None
 
 
-@lru_cache(maxsize=512)
-def lookup_musicbrainz(artist: str, title: str) -> Optional[MusicBrainzMatch]:
-    """Best-effort MusicBrainz lookup without credentials.
+# Persistent lookup cache so re-runs skip the rate-limited network round trip.
+MB_CACHE_TTL_SECONDS = 30 * 24 * 3600
 
-    Returns a lightweight match containing candidate album/date.
-    """
-    artist_q = (artist or "").strip()
-    title_q = (title or "").strip()
-    if not artist_q or not title_q:
-        return None
+_mb_cache_lock = threading.Lock()
+_mb_cache_db: Optional[sqlite3.Connection] = None
+_mb_cache_disabled = False
 
-    query = f'artist:"{artist_q}" AND recording:"{title_q}"'
-    params = urllib.parse.urlencode(
-        {
-            "query": query,
-            "fmt": "json",
-            "limit": 1,
-        }
-    )
 
-    url = f"{MB_BASE}/recording/?{params}"
-    
-    # Use default retry settings since config is not available in cached function
-    data = _mb_get_json(url, timeout=15, max_retries=3, base_delay=0.75)
-    if not data:
-        return None
+def _mb_cache() -> Optional[sqlite3.Connection]:
+    """Open (once) the on-disk lookup cache; None if it cannot be used."""
+    global _mb_cache_db, _mb_cache_disabled
+    if _mb_cache_db is None and not _mb_cache_disabled:
+        try:
+            os.makedirs(os.path.dirname(MB_CACHE_FILE) or ".", exist_ok=True)
+            db = sqlite3.connect(MB_CACHE_FILE, isolation_level=None, check_same_thread=False)
+            db.execute("CREATE TABLE IF NOT EXISTS mb (key TEXT PRIMARY KEY, ts REAL, json TEXT)")
+            _mb_cache_db = db
+        except sqlite3.Error as e:
+            log_warning(f"MusicBrainz cache unavailable: {e}")
+            _mb_cache_disabled = True
+    return _mb_cache_db
+
+
+def _mb_cache_get(key: str) -> Tuple[bool, Optional[MusicBrainzMatch]]:
+    """Return (hit, match); a hit with match None is a cached 'no result'."""
+    with _mb_cache_lock:
+        db = _mb_cache()
+        if db is None:
+            return False, None
+        try:
+            row = db.execute(
+                "SELECT json FROM mb WHERE key = ? AND ts > ?",
+                (key, time.time() - MB_CACHE_TTL_SECONDS),
+            ).fetchone()
+        except sqlite3.Error:
+            return False, None
+    if row is None:
+        return False, None
+    if row[0] is None:
+        return True, None
+    return True, MusicBrainzMatch(**json.loads(row[0]))
+
+
+def _mb_cache_put(key: str, match: Optional[MusicBrainzMatch]) -> None:
+    payload = json.dumps(asdict(match)) if match else None
+    with _mb_cache_lock:
+        db = _mb_cache()
+        if db is None:
+            return
+        try:
+            db.execute("INSERT OR REPLACE INTO mb (key, ts, json) VALUES (?, ?, ?)", (key, time.time(), payload))
+        except sqlite3.Error as e:
+            log_warning(f"MusicBrainz cache write failed: {e}")
+
 
+# Only the search query varies between single-recording lookups.
+_MB_URL_PREFIX = f"{MB_BASE}/recording/?fmt=json&limit=1&query="
+
+
+def _mb_recording_url(artist_q: str, title_q: str) -> str:
+    return _MB_URL_PREFIX + urllib.parse.quote_plus(f'artist:"{artist_q}" AND recording:"{title_q}"')
+
+
+_EMPTY: Dict[str, Any] = {}  # shared read-only fallback for missing nested objects
+
+
+def _mb_credit_name(rec: Dict[str, Any]) -> str:
+    # artist credit can be complex; take the joined string.
+    artist_credit = rec.get("artist-credit")
+    if not artist_credit:
+        return ""
+    return "".join(_as_str(a.get("name") or (a.get("artist") or _EMPTY).get("name") or a.get("joinphrase")) for a in artist_credit)
+
+
+def _parse_mb_recording(data: Dict[str, Any], artist_q: str, title_q: str) -> Optional[MusicBrainzMatch]:
     recs = data.get("recordings") or []
     if not recs:
         return None
+    return _match_from_recording(recs[0], artist_q, title_q)
 
-    rec = recs[0]
+
+def _match_from_recording(rec: Dict[str, Any], artist_q: str, title_q: str) -> Optional[MusicBrainzMatch]:
     rec_id = rec.get("id")
     rec_title = _as_str(rec.get("title"))
-
-    # artist credit can be complex; take the joined string.
-    artist_credit = rec.get("artist-credit") or []
-    artist_name = "".join([_as_str(a.get("name") or a.get("artist", {}).get("name") or a.get("joinphrase")) for a in artist_credit])
-    artist_name = artist_name or artist_q
+    artist_name = _mb_credit_name(rec) or artist_q
 
     release_mbid = None
     release_title = None
@@ -441,86 +587,189 @@ def lookup_musicbrainz(artist: str, title: str) -> Optional[MusicBrainzMatch]:
     )
 
 
-def lookup_musicbrainz_with_config(artist: str, title: str, config: Dict[str, Any]) -> Optional[MusicBrainzMatch]:
-    """Enhanced MusicBrainz lookup with config-based retry settings."""
+class _LookupFailed(Exception):
+    """The MusicBrainz request failed; raised so lru_cache doesn't memoize the miss."""
+
+
+@lru_cache(maxsize=2048)
+def _lookup_recording_cached(artist: str, title: str, timeout: int, max_retries: int, base_delay: float) -> Optional[MusicBrainzMatch]:
+    """Shared, memoized lookup; the retry settings are part of the cache key."""
     artist_q = (artist or "").strip()
     title_q = (title or "").strip()
     if not artist_q or not title_q:
         return None
 
-    query = f'artist:"{artist_q}" AND recording:"{title_q}"'
-    params = urllib.parse.urlencode(
-        {
-            "query": query,
-            "fmt": "json",
-            "limit": 1,
-        }
-    )
+    key = canonical_track_key(artist_q, title_q)
+    hit, match = _mb_cache_get(key)
+    if hit:
+        return match
 
-    url = f"{MB_BASE}/recording/?{params}"
-    
-    # Get retry settings from config (with defaults)
-    max_retries = config.get("musicbrainz_retries", 3)
-    base_delay = config.get("musicbrainz_backoff_base", 0.75)
-    timeout = config.get("musicbrainz_timeout", 15)
-    
-    data = _mb_get_json(url, timeout=timeout, max_retries=max_retries, base_delay=base_delay)
+    data = _mb_get_json(_mb_recording_url(artist_q, title_q), timeout=timeout, max_retries=max_retries, base_delay=base_delay)
     if not data:
-        return None
+        # Request failed; raise instead of returning so neither cache keeps it and the next call retries.
+        raise _LookupFailed
 
-    recs = data.get("recordings") or []
-    if not recs:
+    match = _parse_mb_recording(data, artist_q, title_q)
+    _mb_cache_put(key, match)
+    return match
+
+
+def _lookup_recording(artist: str, title: str, timeout: int, max_retries: int, base_delay: float) -> Optional[MusicBrainzMatch]:
+    try:
+        return _lookup_recording_cached(artist, title, timeout, max_retries, base_delay)
+    except _LookupFailed:
         return None
 
-    rec = recs[0]
-    rec_id = rec.get("id")
-    rec_title = _as_str(rec.get("title"))
 
-    # artist credit can be complex; take the joined string.
-    artist_credit = rec.get("artist-credit") or []
-    artist_name = "".join([_as_str(a.get("name") or a.get("artist", {}).get("name") or a.get("joinphrase")) for a in artist_credit])
-    artist_name = artist_name or artist_q
+MB_BATCH_SIZE = 20  # (artist, title) pairs OR-ed into one search request
 
-    release_mbid = None
-    release_title = None
-    release_date = None
-    releases = rec.get("releases") or []
-    if releases:
-        rel = releases[0]
-        release_mbid = rel.get("id")
-        release_title = _as_str(rel.get("title"))
-        release_date = _as_str(rel.get("date"))
 
-    if not rec_id:
-        return None
+def _lucene_phrase(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
 
-    return MusicBrainzMatch(
-        recording_mbid=rec_id,
-        release_mbid=release_mbid,
-        title=rec_title or title_q,
-        artist=artist_name,
-        album=release_title,
-        date=release_date,
+
+def lookup_musicbrainz_batch(
+    pairs: List[Tuple[str, str]],
+    *,
+    timeout: int = 15,
+    max_retries: int = 3,
+    base_delay: float = 0.75,
+) -> Dict[Tuple[str, str], MusicBrainzMatch]:
+    """Look up many (artist, title) pairs with one search request per MB_BATCH_SIZE pairs.
+
+    Recordings are matched back to the requested pairs by case-insensitive artist
+    credit and title. Matches are written to the on-disk cache, so later
+    lookup_musicbrainz() calls for them are served locally; pairs that could not
+    be matched are left for the single-track lookup.
+    """
+    matches: Dict[str, MusicBrainzMatch] = {}
+    wanted: Dict[str, Tuple[str, str]] = {}
+    for artist, title in pairs:
+        artist_q = (artist or "").strip()
+        title_q = (title or "").strip()
+        if not artist_q or not title_q:
+            continue
+        key = canonical_track_key(artist_q, title_q)
+        if key in matches or key in wanted:
+            continue
+        hit, match = _mb_cache_get(key)
+        if not hit:
+            wanted[key] = (artist_q, title_q)
+        elif match:
+            matches[key] = match
+
+    keys = list(wanted)
+    for start in range(0, len(keys), MB_BATCH_SIZE):
+        chunk = keys[start:start + MB_BATCH_SIZE]
+        query = " OR ".join(
+            f"(artist:{_lucene_phrase(wanted[k][0])} AND recording:{_lucene_phrase(wanted[k][1])})"
+            for k in chunk
+        )
+        params = urllib.parse.urlencode({"query": query, "fmt": "json", "limit": 100})
+        data = _mb_get_json(f"{MB_BASE}/recording/?{params}", timeout=timeout, max_retries=max_retries, base_delay=base_delay)
+        if not data:
+            continue
+
+        pending = set(chunk)
+        # Results are ordered by score, so the first recording per pair wins.
+        for rec in data.get("recordings") or []:
+            key = canonical_track_key(_mb_credit_name(rec), _as_str(rec.get("title")))
+            if key not in pending:
+                continue
+            match = _match_from_recording(rec, *wanted[key])
+            if match:
+                pending.discard(key)
+                matches[key] = match
+                _mb_cache_put(key, match)
+
+    found: Dict[Tuple[str, str], MusicBrainzMatch] = {}
+    for artist, title in pairs:
+        match = matches.get(canonical_track_key((artist or "").strip(), (title or "").strip()))
+        if match:
+            found[(artist, title)] = match
+    return found
+
+
+def prefetch_musicbrainz(tracks: List[Dict[str, Any]], config: Optional[Dict[str, Any]] = None) -> int:
+    """Warm the lookup cache for tracks that embed_track_metadata() would look up.
+
+    Returns the number of tracks matched.
+    """
+    pairs = []
+    for meta in normalize_tracks_bulk(tracks):
+        if _as_str(meta.get("album")) and _as_str(meta.get("date")):
+            continue
+        if meta.get("artist") and meta.get("title"):
+            pairs.append((meta["artist"], meta["title"]))
+    if not pairs:
+        return 0
+
+    config = config or {}
+    return len(
+        lookup_musicbrainz_batch(
+            pairs,
+            timeout=config.get("musicbrainz_timeout", 15),
+            max_retries=config.get("musicbrainz_retries", 3),
+            base_delay=config.get("musicbrainz_backoff_base", 0.75),
+        )
     )
 
 
+def lookup_musicbrainz(artist: str, title: str) -> Optional[MusicBrainzMatch]:
+    """Best-effort MusicBrainz lookup without credentials.
+
+    Returns a lightweight match containing candidate album/date.
+    """
+    # Default retry settings
+    return _lookup_recording(artist, title, timeout=15, max_retries=3, base_delay=0.75)
+
+
+def lookup_musicbrainz_many(
+    pairs: List[Tuple[str, str]], max_workers: int = 4
+) -> Dict[Tuple[str, str], Optional[MusicBrainzMatch]]:
+    """Run lookup_musicbrainz() for many (artist, title) pairs on a thread pool.
+
+    Requests stay paced by the shared token bucket; the threads overlap
+    connection setup and response parsing with the rate-limit wait.
+    """
+    unique = list(dict.fromkeys(pairs))
+    if not unique:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda pair: lookup_musicbrainz(*pair), unique)
+        return dict(zip(unique, results))
+
+
+def lookup_musicbrainz_with_config(artist: str, title: str, config: Dict[str, Any]) -> Optional[MusicBrainzMatch]:
+    """Enhanced MusicBrainz lookup with config-based retry settings."""
+    # Get retry settings from config (with defaults)
+    max_retries = config.get("musicbrainz_retries", 3)
+    base_delay = config.get("musicbrainz_backoff_base", 0.75)
+    timeout = config.get("musicbrainz_timeout", 15)
+
+    return _lookup_recording(artist, title, timeout=timeout, max_retries=max_retries, base_delay=base_delay)
+
+
 # -----------------------------
 # Album art helpers
 # -----------------------------
 
 
-def _find_local_album_art(audio_path: str) -> Optional[bytes]:
-    """Return bytes for a sibling .jpg/.jpeg/.png if present."""
+def _find_local_album_art(audio_path: str) -> Optional[Tuple[bytes, str]]:
+    """Return (bytes, mime) for a sibling .jpg/.jpeg/.png if present."""
     base = os.path.splitext(audio_path)[0]
     for ext in [".jpg", ".jpeg", ".png"]:
         img_path = base + ext
-        if os.path.exists(img_path):
-            try:
-                with open(img_path, "rb") as f:
-                    return f.read()
-            except Exception as e:
-                log_warning(f"Failed reading album art {img_path}: {e}")
-                return None
+        # One stat per candidate; listing the folder instead would be O(folder) per track
+        try:
+            st = os.stat(img_path)
+        except OSError:
+            continue
+        try:
+            return _load_cover_cached(img_path, st.st_mtime_ns, st.st_size)
+        except Exception as e:
+            log_warning(f"Failed reading album art {img_path}: {e}")
+            return None
     return None
 
 
@@ -530,14 +779,90 @@ def _guess_mime(image_bytes: bytes) -> str:
     return "image/jpeg"
 
 
+@lru_cache(maxsize=128)
+def _load_cover_cached(path: str, _mtime_ns: int, size: int) -> Tuple[bytes, str]:
+    """Read a cover image once per (path, mtime, size); albums share one sibling image.
+
+    The MIME type is sniffed from the header as part of the same read.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+    finally:
+        os.close(fd)
+    data = b"".join(chunks)
+    return data, _guess_mime(data)
+
+
+@lru_cache(maxsize=16)
+def _cover_frames(cover_bytes: bytes, cover_mime: str) -> Tuple[APIC, Picture, MP4Cover]:
+    """Picture objects for each container, built once per image and reused across tracks."""
+    apic = APIC(
+        encoding=3,
+        mime=cover_mime,
+        type=3,
+        desc="Cover",
+        data=cover_bytes,
+    )
+
+    pic = Picture()
+    pic.type = 3
+    pic.mime = cover_mime
+    pic.desc = "Cover"
+    pic.data = cover_bytes
+
+    fmt = MP4Cover.FORMAT_PNG if (cover_mime == "image/png") else MP4Cover.FORMAT_JPEG
+    return apic, pic, MP4Cover(cover_bytes, imageformat=fmt)
+
+
 # -----------------------------
 # Embedding (multi-format)
 # -----------------------------
 
 
-def _set_tags_generic(mut: Any, tags: Dict[str, str]) -> None:
+# Canonical tag names, in write order. EasyID3 and Vorbis comments use them as-is.
+_EASY_KEYS = ("artist", "title", "album", "date", "genre", "bpm", "comment")
+# Raw AAC tags: no reliable BPM field.
+_AAC_KEYS = ("artist", "title", "album", "date", "genre", "comment")
+# Canonical -> ID3v2 text frame (comment is a COMM frame, written separately).
+_ID3_FRAMES = {
+    "artist": TPE1,
+    "title": TIT2,
+    "album": TALB,
+    "date": TDRC,
+    "genre": TCON,
+    "bpm": TBPM,
+}
+# Canonical -> MP4 atom (bpm is handled separately as an integer "tmpo").
+_MP4_KEYS = {
+    "artist": "\xa9ART",
+    "title": "\xa9nam",
+    "album": "\xa9alb",
+    "date": "\xa9day",
+    "genre": "\xa9gen",
+    "comment": "\xa9cmt",
+}
+
+
+def _set_easy_tags(audio: Any, tags: Dict[str, str]) -> None:
+    """Set EasyID3-style tags (plain string values) for every non-empty field."""
+    for k in _EASY_KEYS:
+        v = tags.get(k)
+        if v:
+            audio[k] = v
+
+
+def _set_tags_generic(mut: Any, tags: Dict[str, str], keys: Tuple[str, ...] = _EASY_KEYS) -> None:
     """Generic tag setter for Vorbis/FLAC-like mapping tags."""
-    for k, v in tags.items():
+    for k in keys:
+        v = tags.get(k)
         if not v:
             continue
         try:
@@ -551,71 +876,31 @@ def _set_tags_generic(mut: Any, tags: Dict[str, str]) -> None:
 
 
 def _embed_mp3(path: str, tags: Dict[str, str], cover_bytes: Optional[bytes], cover_mime: Optional[str]) -> None:
-    # Ensure ID3 header exists
+    # One ID3 parse and one write for text frames and cover art together.
     try:
-        EasyID3(path)
-    except Exception:
-        try:
-            audio_id3 = ID3()
-            audio_id3.save(path)
-        except Exception:
-            pass
-
-    audio = EasyID3(path)
-    if tags.get("artist"):
-        audio["artist"] = tags["artist"]
-    if tags.get("title"):
-        audio["title"] = tags["title"]
-    if tags.get("album"):
-        audio["album"] = tags["album"]
-    if tags.get("date"):
-        audio["date"] = tags["date"]
-    if tags.get("genre"):
-        audio["genre"] = tags["genre"]
-    if tags.get("bpm"):
-        audio["bpm"] = tags["bpm"]
+        id3 = ID3(path)
+    except ID3NoHeaderError:
+        id3 = ID3()
+
+    for k, frame in _ID3_FRAMES.items():
+        v = tags.get(k)
+        if v:
+            id3.add(frame(encoding=3, text=[v]))
     if tags.get("comment"):
-        audio["comment"] = tags["comment"]
-    audio.save(path)
+        id3.add(COMM(encoding=3, lang="eng", desc="", text=[tags["comment"]]))
 
     if cover_bytes:
-        try:
-            id3 = ID3(path)
-        except ID3NoHeaderError:
-            id3 = ID3()
-        id3["APIC"] = APIC(
-            encoding=3,
-            mime=cover_mime or "image/jpeg",
-            type=3,
-            desc="Cover",
-            data=cover_bytes,
-        )
-        id3.save(path)
+        id3.add(_cover_frames(cover_bytes, cover_mime or "image/jpeg")[0])
+    id3.save(path)
 
 
 def _embed_flac(path: str, tags: Dict[str, str], cover_bytes: Optional[bytes], cover_mime: Optional[str]) -> None:
     audio = FLAC(path)
-    _set_tags_generic(
-        audio,
-        {
-            "artist": tags.get("artist", ""),
-            "title": tags.get("title", ""),
-            "album": tags.get("album", ""),
-            "date": tags.get("date", ""),
-            "genre": tags.get("genre", ""),
-            "bpm": tags.get("bpm", ""),
-            "comment": tags.get("comment", ""),
-        },
-    )
+    _set_tags_generic(audio, tags)
 
     if cover_bytes:
-        pic = Picture()
-        pic.type = 3
-        pic.mime = cover_mime or "image/jpeg"
-        pic.desc = "Cover"
-        pic.data = cover_bytes
         audio.clear_pictures()
-        audio.add_picture(pic)
+        audio.add_picture(_cover_frames(cover_bytes, cover_mime or "image/jpeg")[1])
 
     audio.save()
 
@@ -624,61 +909,30 @@ def _embed_vorbis(path: str, tags: Dict[str, str], cover_bytes: Optional[bytes],
     # Note: embedding cover art in OGG/Vorbis is possible via METADATA_BLOCK_PICTURE,
     # but not all players support it consistently. We default to *not* embedding.
     audio = OggVorbis(path)
-    _set_tags_generic(
-        audio,
-        {
-            "artist": tags.get("artist", ""),
-            "title": tags.get("title", ""),
-            "album": tags.get("album", ""),
-            "date": tags.get("date", ""),
-            "genre": tags.get("genre", ""),
-            "bpm": tags.get("bpm", ""),
-            "comment": tags.get("comment", ""),
-        },
-    )
+    _set_tags_generic(audio, tags)
     audio.save()
 
 
 def _embed_opus(path: str, tags: Dict[str, str], cover_bytes: Optional[bytes], _cover_mime: Optional[str]) -> None:
     audio = OggOpus(path)
-    _set_tags_generic(
-        audio,
-        {
-            "artist": tags.get("artist", ""),
-            "title": tags.get("title", ""),
-            "album": tags.get("album", ""),
-            "date": tags.get("date", ""),
-            "genre": tags.get("genre", ""),
-            "bpm": tags.get("bpm", ""),
-            "comment": tags.get("comment", ""),
-        },
-    )
+    _set_tags_generic(audio, tags)
     audio.save()
 
 
 def _embed_m4a(path: str, tags: Dict[str, str], cover_bytes: Optional[bytes], cover_mime: Optional[str]) -> None:
     audio = MP4(path)
-    if tags.get("artist"):
-        audio["\xa9ART"] = [tags["artist"]]
-    if tags.get("title"):
-        audio["\xa9nam"] = [tags["title"]]
-    if tags.get("album"):
-        audio["\xa9alb"] = [tags["album"]]
-    if tags.get("date"):
-        audio["\xa9day"] = [tags["date"]]
-    if tags.get("genre"):
-        audio["\xa9gen"] = [tags["genre"]]
+    for k, atom in _MP4_KEYS.items():
+        v = tags.get(k)
+        if v:
+            audio[atom] = [v]
     if tags.get("bpm"):
         try:
             audio["tmpo"] = [int(float(tags["bpm"]))]
         except Exception:
             pass
-    if tags.get("comment"):
-        audio["\xa9cmt"] = [tags["comment"]]
 
     if cover_bytes:
-        fmt = MP4Cover.FORMAT_PNG if (cover_mime == "image/png") else MP4Cover.FORMAT_JPEG
-        audio["covr"] = [MP4Cover(cover_bytes, imageformat=fmt)]
+        audio["covr"] = [_cover_frames(cover_bytes, cover_mime or "image/jpeg")[2]]
 
     audio.save()
 
@@ -687,17 +941,7 @@ def _embed_aac(path: str, tags: Dict[str, str], _cover_bytes: Optional[bytes], _
     # AAC (ADTS) metadata support is limited; mutagen can store tags in some containers.
     audio = AAC(path)
     # AAC tags are generally not as portable; set what we can.
-    _set_tags_generic(
-        audio,
-        {
-            "artist": tags.get("artist", ""),
-            "title": tags.get("title", ""),
-            "album": tags.get("album", ""),
-            "date": tags.get("date", ""),
-            "genre": tags.get("genre", ""),
-            "comment": tags.get("comment", ""),
-        },
-    )
+    _set_tags_generic(audio, tags, _AAC_KEYS)
     audio.save()
 
 
@@ -721,20 +965,7 @@ def _embed_wav(path: str, tags: Dict[str, str], cover_bytes: Optional[bytes], co
         # Use EasyID3-style path where possible
         try:
             easy = EasyID3(path)
-            if tags.get("artist"):
-                easy["artist"] = tags["artist"]
-            if tags.get("title"):
-                easy["title"] = tags["title"]
-            if tags.get("album"):
-                easy["album"] = tags["album"]
-            if tags.get("date"):
-                easy["date"] = tags["date"]
-            if tags.get("genre"):
-                easy["genre"] = tags["genre"]
-            if tags.get("bpm"):
-                easy["bpm"] = tags["bpm"]
-            if tags.get("comment"):
-                easy["comment"] = tags["comment"]
+            _set_easy_tags(easy, tags)
             easy.save(path)
         except Exception:
             # If EasyID3 doesn't work, do nothing further.
@@ -745,19 +976,32 @@ def _embed_wav(path: str, tags: Dict[str, str], cover_bytes: Optional[bytes], co
                 id3 = ID3(path)
             except Exception:
                 id3 = ID3()
-            id3["APIC"] = APIC(
-                encoding=3,
-                mime=cover_mime or "image/jpeg",
-                type=3,
-                desc="Cover",
-                data=cover_bytes,
-            )
+            id3["APIC"] = _cover_frames(cover_bytes, cover_mime or "image/jpeg")[0]
             id3.save(path)
     except Exception:
         # Not fatal
         pass
 
 
+def _embed_ogg(path: str, tags: Dict[str, str], cover_bytes: Optional[bytes], cover_mime: Optional[str]) -> None:
+    # Prefer trying Vorbis first; if it's Opus, fall back.
+    try:
+        _embed_vorbis(path, tags, cover_bytes, cover_mime)
+    except Exception:
+        _embed_opus(path, tags, cover_bytes, cover_mime)
+
+
+# Extension -> embedder; anything else goes through mutagen's generic loader.
+_EMBEDDERS = {
+    ".mp3": _embed_mp3,
+    ".flac": _embed_flac,
+    ".ogg": _embed_ogg,
+    ".m4a": _embed_m4a,
+    ".aac": _embed_aac,
+    ".wav": _embed_wav,
+}
+
+
 def embed_track_metadata(
     audio_path: str,
     track: Dict[str, Any],
@@ -782,8 +1026,7 @@ def embed_track_metadata(
         log_warning(f"Metadata skip: unsupported extension {ext}: {audio_path}")
         return False
 
-    base_meta = normalize_track_metadata(track)
-    base_meta = correct_metadata(base_meta)
+    base_meta = _normalize_corrected(track)
 
     if allow_musicbrainz:
         # Only do network lookup if we have core identifiers and are missing album/date.
@@ -812,31 +1055,17 @@ def embed_track_metadata(
         "comment": _as_str(meta.get("comment")),
     }
 
-    tpl = get_metadata_template(template)
     cover_bytes = None
     cover_mime = None
-    if tpl.get("embed_cover_art"):
-        cover_bytes = _find_local_album_art(audio_path)
-        if cover_bytes:
-            cover_mime = _guess_mime(cover_bytes)
+    if _TEMPLATE_EMBED_COVER.get(template or "basic", False):
+        cover = _find_local_album_art(audio_path)
+        if cover and cover[0]:
+            cover_bytes, cover_mime = cover
 
     try:
-        if ext == ".mp3":
-            _embed_mp3(audio_path, tags, cover_bytes, cover_mime)
-        elif ext == ".flac":
-            _embed_flac(audio_path, tags, cover_bytes, cover_mime)
-        elif ext == ".ogg":
-            # Prefer trying Vorbis first; if it's Opus, fall back.
-            try:
-                _embed_vorbis(audio_path, tags, cover_bytes, cover_mime)
-            except Exception:
-                _embed_opus(audio_path, tags, cover_bytes, cover_mime)
-        elif ext == ".m4a":
-            _embed_m4a(audio_path, tags, cover_bytes, cover_mime)
-        elif ext == ".aac":
-            _embed_aac(audio_path, tags, cover_bytes, cover_mime)
-        elif ext == ".wav":
-            _embed_wav(audio_path, tags, cover_bytes, cover_mime)
+        embed = _EMBEDDERS.get(ext)
+        if embed is not None:
+            embed(audio_path, tags, cover_bytes, cover_mime)
         else:
             # Best-effort fallback using mutagen's generic loader.
             mut = MutagenFile(audio_path)
@@ -847,7 +1076,7 @@ def embed_track_metadata(
                     mut.add_tags()
                 except Exception:
                     pass
-            _set_tags_generic(mut, {k: v for k, v in tags.items() if v})
+            _set_tags_generic(mut, tags)
             mut.save()
 
         log_info(f"Metadata embedded: {os.path.basename(audio_path)}")
@@ -857,26 +1086,31 @@ def embed_track_metadata(
         return False
 
 
+_SORTED_AUDIO_EXTENSIONS = tuple(sorted(VALID_AUDIO_EXTENSIONS))
+
+
 def find_downloaded_audio_path(output_dir: str, base_filename: str) -> Optional[str]:
     """Given output_dir and a base filename (without extension), find the created audio file."""
     if not output_dir or not base_filename:
         return None
 
-    for ext in sorted(VALID_AUDIO_EXTENSIONS):
-        candidate = os.path.join(output_dir, base_filename + ext)
-        if os.path.exists(candidate):
-            return candidate
+    # One directory listing serves both the exact-name probe and the fallback scan.
+    try:
+        with os.scandir(output_dir) as entries:
+            names = [e.name for e in entries]
+    except OSError:
+        return None
+
+    present = set(names)
+    for ext in _SORTED_AUDIO_EXTENSIONS:
+        if base_filename + ext in present:
+            return os.path.join(output_dir, base_filename + ext)
 
     # yt-dlp might output with a different extension casing or additional suffixes; best effort scan.
-    try:
-        for name in os.listdir(output_dir):
-            if not name.lower().startswith(base_filename.lower()):
-                continue
-            p = os.path.join(output_dir, name)
-            if os.path.splitext(p)[1].lower() in VALID_AUDIO_EXTENSIONS:
-                return p
-    except Exception:
-        pass
+    prefix = base_filename.lower()
+    for name in names:
+        if name.lower().startswith(prefix) and os.path.splitext(name)[1].lower() in VALID_AUDIO_EXTENSIONS:
+            return os.path.join(output_dir, name)
 
     return None
 
@@ -884,6 +1118,7 @@ def find_downloaded_audio_path(output_dir: str, base_filename: str) -> Optional[
 def embed_metadata(output_dir: str) -> None:
     """Legacy batch embed function: walk output_dir and tag all supported audio files by filename parsing."""
     try:
+        jobs = []
         for root, _, files in os.walk(output_dir):
             for file in files:
                 ext = os.path.splitext(file)[1].lower()
@@ -900,12 +1135,17 @@ def embed_metadata(output_dir: str) -> None:
                     log_error(f"Skipping {file}: Cannot parse artist/title")
                     continue
 
-                embed_track_metadata(
-                    filepath,
-                    {"artist": artist.strip(), "track": title.strip()},
-                    template="basic",
-                    allow_musicbrainz=False,
-                )
+                jobs.append((filepath, {"artist": artist.strip(), "track": title.strip()}))
+
+        if not jobs:
+            return
+
+        # Tagging is file I/O bound and makes no network calls here, so files are tagged in parallel.
+        with ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 4, len(jobs))) as executor:
+            list(executor.map(
+                lambda job: embed_track_metadata(job[0], job[1], template="basic", allow_musicbrainz=False),
+                jobs,
+            ))
 
     except Exception as e:
         log_error(f"Error in embed_metadata: {e}")
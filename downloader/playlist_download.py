@@ -7,7 +7,7 @@ from downloader.base_downloader import batch_download
 Downloads all pending tracks for a given playlist.
 Creates the playlist folder if it doesn't exist.
 """
-async def download_playlist(playlist_name, tracks, output_dir, audio_format, sleep_between):
+async def download_playlist(playlist_name, tracks, output_dir, audio_format, sleep_between, sem=None):
     sanitized_name = playlist_name.replace("/", "-").strip()
     playlist_dir = os.path.join(output_dir, sanitized_name)
 
@@ -21,5 +21,5 @@ async def download_playlist(playlist_name, tracks, output_dir, audio_format, sle
         for t in tracks
     ]
 
-    await batch_download(formatted_tracks, playlist_dir, audio_format)
+    await batch_download(formatted_tracks, playlist_dir, audio_format, sem=sem)
     log_success(f"Finished downloading playlist: {playlist_name}")
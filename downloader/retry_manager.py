@@ -1,9 +1,23 @@
 import os
 import json
 import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
 from downloader.base_downloader import download_track
 from utils.logger import log_info, log_error, log_warning
-from constants import FAILED_FILE
+from utils.json_io import JSON_IO_BUFFER_SIZE, load_json, dump_json
+from constants import FAILED_FILE, FAILED_FILE_JSONL
+
+# (mtime_ns, size) of FAILED_FILE and FAILED_FILE_JSONL -> count, so menus
+# polling get_failed_count don't reparse an unchanged list.
+_failed_count_cache = {"stamp": None, "count": 0}
 
 
 def retry_failed(config):
@@ -12,29 +26,29 @@ def retry_failed(config):
     
     Config options used:
     - retry_attempts: Maximum number of retry attempts per track
-    - retry_delay: Base delay between retries (uses exponential backoff)
+    - retry_delay: Base delay between retries (uses exponential backoff with jitter)
+    - retry_max_delay: Upper bound on the backoff delay before jitter is added
+    - retry_concurrency: How many tracks to retry at once (1 = one at a time)
     - auto_backup: Whether to backup before modifying failed_downloads.json
     """
-    if not os.path.exists(FAILED_FILE):
+    if not os.path.exists(FAILED_FILE) and not os.path.exists(FAILED_FILE_JSONL) and not _claimed_logs():
         log_info("No failed downloads to retry.")
         return
 
     # Get retry configuration
     max_attempts = config.get("retry_attempts", 3)
     base_delay = config.get("retry_delay", 5)
+    max_delay = config.get("retry_max_delay", 300)
+    concurrency = max(1, config.get("retry_concurrency", 1))
     auto_backup = config.get("auto_backup", True)
     
     if max_attempts == 0:
         log_info("Retry is disabled (retry_attempts=0).")
         return
 
+    logs = _claim_failed_logs()
     try:
-        with open(FAILED_FILE, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-            if not content:
-                log_info("No failed downloads.")
-                return
-            failed_tracks = json.loads(content)
+        failed_tracks = _load_failed_tracks(logs)
     except json.JSONDecodeError:
         log_error("Failed downloads file is corrupted or invalid JSON.")
         return
@@ -52,115 +66,191 @@ def retry_failed(config):
             pass  # Backup manager not yet available
 
     log_info(f"Retrying {len(failed_tracks)} failed downloads (max {max_attempts} attempts each)...")
-    still_failed = []
 
-    for t in failed_tracks:
-        track_attempts = t.get("attempt_count", 0)
-        
-        if track_attempts >= max_attempts:
-            log_warning(f"Skipping {t['artist']} - {t['track']} (exceeded max attempts: {track_attempts})")
-            still_failed.append(t)
-            continue
-        
-        success = False
-        
-        for attempt in range(1, max_attempts - track_attempts + 1):
-            # Exponential backoff delay
-            delay = base_delay * (2 ** (attempt - 1))
-            
-            log_info(f"Retry attempt {attempt}/{max_attempts - track_attempts} for: {t['artist']} - {t['track']}")
-            
-            try:
-                download_track(
-                    t["artist"], 
-                    t["track"], 
-                    config["output_dir"], 
-                    config["audio_format"], 
-                    config["sleep_between"]
-                )
-                success = True
-                log_info(f"Successfully downloaded on retry: {t['artist']} - {t['track']}")
-                break
-            except Exception as e:
-                log_error(f"Retry attempt {attempt} failed: {t['artist']} - {t['track']} - {e}")
-                
-                if attempt < max_attempts - track_attempts:
-                    log_info(f"Waiting {delay}s before next attempt...")
-                    time.sleep(delay)
-        
-        if not success:
-            # Update attempt count
-            t["attempt_count"] = t.get("attempt_count", 0) + (max_attempts - track_attempts)
-            still_failed.append(t)
-
-    # Save remaining failed tracks
-    with open(FAILED_FILE, "w", encoding="utf-8") as f:
-        json.dump(still_failed, f, indent=2)
+    def retry_one(t):
+        return _retry_track(t, config, max_attempts, base_delay, max_delay)
+
+    if concurrency == 1:
+        results = [retry_one(t) for t in failed_tracks]
+    else:
+        # Downloads are network/subprocess bound, so a few can run side by side;
+        # map() keeps the results in the original list order
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(failed_tracks))) as ex:
+            results = list(ex.map(retry_one, failed_tracks))
+    still_failed = [t for t in results if t is not None]
+
+    # Save remaining failed tracks; failures recorded during the retry stay in the live log
+    _save_failed_tracks(still_failed, logs)
     
     # Summary
     retried_count = len(failed_tracks) - len(still_failed)
     log_info(f"Retry complete: {retried_count} succeeded, {len(still_failed)} still failed.")
 
 
+def _retry_track(t: dict, config: dict, max_attempts: int, base_delay: float, max_delay: float) -> Optional[dict]:
+    """Retry one failed track; returns it (attempt_count updated) if it still fails, else None."""
+    track_attempts = t.get("attempt_count", 0)
+    
+    if track_attempts >= max_attempts:
+        log_warning(f"Skipping {t['artist']} - {t['track']} (exceeded max attempts: {track_attempts})")
+        return t
+    
+    for attempt in range(1, max_attempts - track_attempts + 1):
+        # Exponential backoff, capped, plus up to 25% jitter so tracks that
+        # failed together don't all retry at the same instant
+        delay = min(base_delay * (2 ** (attempt - 1)), max_delay)
+        delay += random.uniform(0, delay * 0.25)
+        
+        log_info(f"Retry attempt {attempt}/{max_attempts - track_attempts} for: {t['artist']} - {t['track']}")
+        
+        ok = download_track(
+            t["artist"],
+            t["track"],
+            config["output_dir"],
+            config["audio_format"],
+            config["sleep_between"],
+            # Attempts are counted here; logging them would re-add the track
+            # to the failure log this run is compacting
+            record_failure=False,
+        )
+        if ok:
+            log_info(f"Successfully downloaded on retry: {t['artist']} - {t['track']}")
+            return None
+
+        log_error(f"Retry attempt {attempt} failed: {t['artist']} - {t['track']}")
+        if attempt < max_attempts - track_attempts:
+            log_info(f"Waiting {delay:.1f}s before next attempt...")
+            time.sleep(delay)
+    
+    # Update attempt count
+    t["attempt_count"] = t.get("attempt_count", 0) + (max_attempts - track_attempts)
+    return t
+
+
 def add_failed_track(artist: str, track: str, error: str = None, config: dict = None):
     """
     Add a track to the failed downloads list with retry tracking.
+
+    The failure is appended as one line to FAILED_FILE_JSONL; it is folded into
+    FAILED_FILE (deduplicated, attempt_count bumped) the next time the list is
+    retried or cleared, so recording a failure never rewrites the whole list.
+    """
+    record = {"artist": artist, "track": track, "last_error": error}
+    if orjson:
+        line = orjson.dumps(record) + b"\n"
+    else:
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+    os.makedirs(os.path.dirname(FAILED_FILE_JSONL) or ".", exist_ok=True)
+    with open(FAILED_FILE_JSONL, "ab") as f:
+        f.write(line)
+    _failed_count_cache["stamp"] = None
+
+
+def _claimed_logs() -> list:
+    """Append logs already moved aside by _claim_failed_logs (possibly by a run that died before saving)."""
+    dirname, base = os.path.split(FAILED_FILE_JSONL)
+    prefix = base + "."
+    try:
+        with os.scandir(dirname or ".") as entries:
+            return sorted(e.path for e in entries if e.name.startswith(prefix))
+    except FileNotFoundError:
+        return []
+
+
+def _claim_failed_logs() -> list:
+    """
+    Atomically move FAILED_FILE_JSONL aside and return every claimed log.
+
+    Failures appended after the rename start a fresh FAILED_FILE_JSONL, so
+    _save_failed_tracks can delete exactly the logs that were read and never
+    a line written in between.
+    """
+    try:
+        os.replace(FAILED_FILE_JSONL, f"{FAILED_FILE_JSONL}.{os.getpid()}.{time.time_ns()}")
+    except OSError:
+        pass  # no log yet (or it's busy); its lines wait for the next claim
+    return _claimed_logs()
+
+
+def _load_failed_tracks(logs: Optional[list] = None) -> list:
+    """
+    Return the failed-track list: FAILED_FILE plus the failures in the given
+    append logs, merged by (artist, track). By default every log is read
+    without claiming it: the claimed ones and the live FAILED_FILE_JSONL.
+
+    Raises json.JSONDecodeError if FAILED_FILE is corrupted.
     """
     failed_tracks = []
-    
     if os.path.exists(FAILED_FILE):
+        failed_tracks = load_json(FAILED_FILE, default=[])
+
+    if logs is None:
+        logs = _claimed_logs() + [FAILED_FILE_JSONL]
+
+    by_key = {(t["artist"], t["track"]): t for t in failed_tracks}
+    parse = orjson.loads if orjson else json.loads
+    for log_path in logs:
         try:
-            with open(FAILED_FILE, "r", encoding="utf-8") as f:
-                content = f.read().strip()
-                if content:
-                    failed_tracks = json.loads(content)
-        except (json.JSONDecodeError, IOError):
-            failed_tracks = []
-    
-    # Check if track already exists
-    for t in failed_tracks:
-        if t["artist"] == artist and t["track"] == track:
-            t["attempt_count"] = t.get("attempt_count", 0) + 1
-            t["last_error"] = error
-            break
-    else:
-        failed_tracks.append({
-            "artist": artist,
-            "track": track,
-            "attempt_count": 1,
-            "last_error": error
-        })
-    
-    # Auto-backup before modifying
-    if config and config.get("auto_backup", True):
+            f = open(log_path, "rb", buffering=JSON_IO_BUFFER_SIZE)
+        except FileNotFoundError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    entry = parse(line)
+                except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses this
+                    continue  # torn final line from an interrupted write
+                key = (entry["artist"], entry["track"])
+                t = by_key.get(key)
+                if t is None:
+                    t = by_key[key] = {
+                        "artist": entry["artist"],
+                        "track": entry["track"],
+                        "attempt_count": 0,
+                    }
+                    failed_tracks.append(t)
+                t["attempt_count"] = t.get("attempt_count", 0) + 1
+                t["last_error"] = entry.get("last_error")
+    return failed_tracks
+
+
+def _save_failed_tracks(failed_tracks: list, logs: list) -> None:
+    """Atomically write the compacted list to FAILED_FILE and drop the claimed logs it was built from."""
+    dump_json(failed_tracks, FAILED_FILE)
+    for log_path in logs:
         try:
-            from managers.backup_manager import backup_json_file
-            backup_json_file(FAILED_FILE)
-        except ImportError:
+            os.remove(log_path)
+        except FileNotFoundError:
             pass
-    
-    with open(FAILED_FILE, "w", encoding="utf-8") as f:
-        json.dump(failed_tracks, f, indent=2)
 
 
 def clear_failed_tracks():
     """Clear all failed tracks from the list."""
-    if os.path.exists(FAILED_FILE):
-        with open(FAILED_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f, indent=2)
+    if os.path.exists(FAILED_FILE) or os.path.exists(FAILED_FILE_JSONL) or _claimed_logs():
+        _save_failed_tracks([], _claim_failed_logs())
+        _failed_count_cache["stamp"] = None
         log_info("Cleared failed downloads list.")
 
 
+def _file_stamp(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 def get_failed_count() -> int:
-    """Get the count of failed downloads."""
-    if not os.path.exists(FAILED_FILE):
+    """Get the count of failed downloads, reparsing only when either file changed."""
+    stamp = (_file_stamp(FAILED_FILE), _file_stamp(FAILED_FILE_JSONL))
+    if stamp == (None, None) and not _claimed_logs():
         return 0
-    
+    if stamp == _failed_count_cache["stamp"]:
+        return _failed_count_cache["count"]
     try:
-        with open(FAILED_FILE, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-            if not content:
-                return 0
-            return len(json.loads(content))
+        count = len(_load_failed_tracks())
     except (json.JSONDecodeError, IOError):
         return 0
+    _failed_count_cache["stamp"] = stamp
+    _failed_count_cache["count"] = count
+    return count
@@ -2,6 +2,12 @@ import os
 import subprocess
 import json
 import questionary
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
 from utils.logger import log_info, log_success, log_error
 
 def get_youtube_info(url):
@@ -9,34 +15,31 @@ def get_youtube_info(url):
     Fetches video/playlist metadata using yt-dlp in JSON format.
     """
     try:
-        result = subprocess.run(
+        # For playlist, yt-dlp outputs one JSON per line; parse them as they arrive
+        # instead of buffering the whole output. stderr is discarded so it can't
+        # fill its pipe while only stdout is being drained.
+        with subprocess.Popen(
             ["yt-dlp", "-j", "--flat-playlist", url],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=65536,
             text=True
-        )
-        if result.returncode != 0:
+        ) as proc:
+            loads = orjson.loads if orjson else json.loads
+            data = []
+            for line in proc.stdout:
+                if line.strip():
+                    try:
+                        data.append(loads(line))
+                    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses this
+                        # Skip invalid JSON lines instead of crashing
+                        continue
+            returncode = proc.wait()
+
+        if returncode != 0:
             log_error(f"Failed to fetch info for {url}")
             return None
 
-        # For playlist, yt-dlp outputs one JSON per line
-        lines = result.stdout.strip().split("\n")
-        # #region agent log
-        import json as json_module
-        import time
-        data = []
-        for idx, line in enumerate(lines):
-            if line.strip():
-                try:
-                    parsed = json_module.loads(line)
-                    data.append(parsed)
-                except json_module.JSONDecodeError as e:
-                    with open('/Users/saadaboussabr/Desktop/Archive/Temp/spotify-yt-dlp-downloader/.cursor/debug.log', 'a') as f:
-                        f.write(json_module.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"C","location":"downloader/youtube_link_downloader.py:23","message":"JSONDecodeError parsing yt-dlp output - skipping line","data":{"line_index":idx,"line_preview":line[:100],"error":str(e)},"timestamp":int(time.time()*1000)}) + '\n')
-                    # Skip invalid JSON lines instead of crashing
-                    continue
-        with open('/Users/saadaboussabr/Desktop/Archive/Temp/spotify-yt-dlp-downloader/.cursor/debug.log', 'a') as f:
-            f.write(json_module.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"C","location":"downloader/youtube_link_downloader.py:23","message":"successfully parsed all lines","data":{"lines_count":len(lines),"parsed_count":len(data)},"timestamp":int(time.time()*1000)}) + '\n')
-        # #endregion
         return data
     except Exception as e:
         log_error(f"Error fetching info: {e}")
@@ -1,9 +1,13 @@
 import os
 import json
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, List
 from utils.logger import log_info, log_warning, log_error
+from utils.json_io import JSON_IO_BUFFER_SIZE, dump_json, load_json, parse_json, write_atomic
+from utils.loaders import read_tracks_log, tracks_log_path
+from constants import FAILED_FILE
 
 # Default backup directory
 BACKUP_DIR = "data/backups"
@@ -16,6 +20,12 @@ BACKUP_TARGETS = [
     "data/download_history.json"
 ]
 
+# Files this app only ever replaces via temp file + os.replace (json_io.dump_json),
+# never rewritten in place, so a hardlink is a safe O(1) snapshot of them. The
+# user-supplied inputs (tracks.json, playlists.json) can be overwritten in place
+# by cp or an editor, which would rewrite a hardlinked backup too, so they are copied.
+_HARDLINK_SAFE = {os.path.normpath(FAILED_FILE)}
+
 
 def ensure_backup_dir():
     """Ensure the backup directory exists."""
@@ -23,13 +33,68 @@ def ensure_backup_dir():
         os.makedirs(BACKUP_DIR, exist_ok=True)
 
 
-def backup_json_file(filepath: str, config: dict = None) -> Optional[str]:
+def _scan_backups() -> List[tuple]:
+    """Return (filename, path, stat) for every .json backup, from one scandir pass."""
+    entries = []
+    with os.scandir(BACKUP_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                entries.append((entry.name, entry.path, entry.stat()))
+            except OSError:
+                continue
+    return entries
+
+
+def list_backup_names(file_prefix: Optional[str] = None) -> List[str]:
+    """
+    List backup filenames, newest first, without stat-ing anything.
+    
+    Names embed a YYYYMMDD_HHMMSS stamp, so for a single file_prefix the
+    reverse string sort is creation order.
+    """
+    ensure_backup_dir()
+    prefix = file_prefix + "_" if file_prefix else ""
+    names = [n for n in os.listdir(BACKUP_DIR) if n.startswith(prefix) and n.endswith(".json")]
+    names.sort(reverse=True)
+    return names
+
+
+def _snapshot(filepath: str, backup_path: str):
+    """Write the backup of filepath to backup_path."""
+    # Synced tracks sit in the JSONL log until compaction; fold them into
+    # the snapshot so it holds the whole library on its own. (The failed
+    # downloads list has a .jsonl log too, but it isn't a {"tracks": ...} file.)
+    if os.path.exists(tracks_log_path(filepath)):
+        data = load_json(filepath, default={})
+        if isinstance(data, dict):
+            data["tracks"] = data.get("tracks", []) + read_tracks_log(filepath)
+            dump_json(data, backup_path, indent=None)
+            return
+
+    if os.path.normpath(filepath) not in _HARDLINK_SAFE:
+        shutil.copy2(filepath, backup_path)
+        return
+
+    # Fall back to a real copy across filesystems or where links aren't supported
+    try:
+        os.link(filepath, backup_path)
+    except FileExistsError:
+        if not os.path.samefile(filepath, backup_path):
+            shutil.copy2(filepath, backup_path)
+    except OSError:
+        shutil.copy2(filepath, backup_path)
+
+
+def backup_json_file(filepath: str, config: dict = None, _prune: bool = True) -> Optional[str]:
     """
     Create a timestamped backup of a JSON file.
     
     Args:
         filepath: Path to the file to backup
         config: Optional config dict for max_backups setting
+        _prune: Enforce max_backups right away (backup_all prunes once afterwards)
     
     Returns:
         Path to the backup file, or None if backup failed
@@ -51,11 +116,11 @@ def backup_json_file(filepath: str, config: dict = None) -> Optional[str]:
     backup_path = os.path.join(BACKUP_DIR, backup_name)
     
     try:
-        shutil.copy2(filepath, backup_path)
+        _snapshot(filepath, backup_path)
         log_info(f"Created backup: {backup_name}")
         
         # Enforce max backup limit if config provided
-        if config:
+        if config and _prune:
             max_backups = config.get("max_backups", 10)
             cleanup_old_backups(name, max_backups)
         
@@ -78,14 +143,23 @@ def backup_all(config: dict) -> dict:
     if not config.get("auto_backup", True):
         return {"skipped": True, "reason": "auto_backup disabled"}
     
-    results = {}
+    results = {filepath: "not_found" for filepath in BACKUP_TARGETS}
+    targets = [filepath for filepath in BACKUP_TARGETS if os.path.exists(filepath)]
     
-    for filepath in BACKUP_TARGETS:
-        if os.path.exists(filepath):
-            backup_path = backup_json_file(filepath, config)
-            results[filepath] = backup_path if backup_path else "failed"
-        else:
-            results[filepath] = "not_found"
+    if targets:
+        ensure_backup_dir()
+        # Copies are independent and I/O-bound, so overlap them
+        with ThreadPoolExecutor(max_workers=min(4, len(targets))) as ex:
+            for filepath, backup_path in zip(targets, ex.map(lambda p: backup_json_file(p, config, _prune=False), targets)):
+                results[filepath] = backup_path if backup_path else "failed"
+        
+        # Enforce max_backups for every target from a single directory listing
+        max_backups = config.get("max_backups", 10)
+        if max_backups > 0:
+            names = list_backup_names()
+            for filepath in targets:
+                name = os.path.splitext(os.path.basename(filepath))[0]
+                cleanup_old_backups(name, max_backups, _names=names)
     
     successful = sum(1 for v in results.values() if v not in ["failed", "not_found"])
     log_info(f"Backup complete: {successful}/{len(BACKUP_TARGETS)} files backed up")
@@ -93,7 +167,7 @@ def backup_all(config: dict) -> dict:
     return results
 
 
-def cleanup_old_backups(file_prefix: str, max_backups: int):
+def cleanup_old_backups(file_prefix: str, max_backups: int, _names: Optional[List[str]] = None):
     """
     Remove old backups exceeding the maximum count.
     Keeps the most recent backups.
@@ -101,27 +175,24 @@ def cleanup_old_backups(file_prefix: str, max_backups: int):
     Args:
         file_prefix: The base name of the file (e.g., "tracks" for tracks_*.json)
         max_backups: Maximum number of backups to keep
+        _names: Pre-fetched list_backup_names() result to reuse instead of relisting
     """
     if max_backups <= 0:
         return  # Unlimited backups
     
-    ensure_backup_dir()
-    
-    # Find all backups for this file
-    backups = []
-    for filename in os.listdir(BACKUP_DIR):
-        if filename.startswith(file_prefix + "_") and filename.endswith(".json"):
-            filepath = os.path.join(BACKUP_DIR, filename)
-            backups.append((filepath, os.path.getmtime(filepath)))
-    
-    # Sort by modification time (newest first)
-    backups.sort(key=lambda x: x[1], reverse=True)
+    # Find all backups for this file, newest first by their filename timestamp
+    if _names is None:
+        backups = list_backup_names(file_prefix)
+    else:
+        prefix = file_prefix + "_"
+        backups = [n for n in _names if n.startswith(prefix)]
     
     # Remove excess backups
-    for filepath, _ in backups[max_backups:]:
+    for filename in backups[max_backups:]:
+        filepath = os.path.join(BACKUP_DIR, filename)
         try:
             os.remove(filepath)
-            log_info(f"Removed old backup: {os.path.basename(filepath)}")
+            log_info(f"Removed old backup: {filename}")
         except OSError as e:
             log_warning(f"Could not remove old backup {filepath}: {e}")
 
@@ -140,26 +211,17 @@ def list_backups(file_prefix: Optional[str] = None) -> List[dict]:
     
     backups = []
     
-    for filename in os.listdir(BACKUP_DIR):
-        if not filename.endswith(".json"):
-            continue
-        
+    for filename, filepath, stat in _scan_backups():
         if file_prefix and not filename.startswith(file_prefix + "_"):
             continue
         
-        filepath = os.path.join(BACKUP_DIR, filename)
-        
-        try:
-            stat = os.stat(filepath)
-            backups.append({
-                "filename": filename,
-                "path": filepath,
-                "size": stat.st_size,
-                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                "modified_timestamp": stat.st_mtime
-            })
-        except OSError:
-            continue
+        backups.append({
+            "filename": filename,
+            "path": filepath,
+            "size": stat.st_size,
+            "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            "modified_timestamp": stat.st_mtime
+        })
     
     # Sort by modification time (newest first)
     backups.sort(key=lambda x: x["modified_timestamp"], reverse=True)
@@ -183,9 +245,10 @@ def restore_backup(backup_path: str, target_path: str) -> bool:
         return False
     
     try:
-        # Validate JSON before restoring
-        with open(backup_path, "r", encoding="utf-8") as f:
-            json.load(f)  # Validate it's valid JSON
+        # Read once: the same bytes are validated and then written out
+        with open(backup_path, "rb", buffering=JSON_IO_BUFFER_SIZE) as f:
+            raw = f.read()
+        restored = parse_json(raw)  # Validate it's valid JSON
         
         # Create backup of current file before overwriting
         if os.path.exists(target_path):
@@ -193,8 +256,10 @@ def restore_backup(backup_path: str, target_path: str) -> bool:
             if current_backup:
                 log_info(f"Created backup of current file before restore")
         
-        # Restore the backup
-        shutil.copy2(backup_path, target_path)
+        # Restore via temp file + os.replace so target_path is never left half-written
+        write_atomic(raw, target_path)
+        shutil.copystat(backup_path, target_path)
+        _discard_tracks_log(target_path, restored)
         log_info(f"Restored backup: {os.path.basename(backup_path)} -> {target_path}")
         return True
     
@@ -206,6 +271,24 @@ def restore_backup(backup_path: str, target_path: str) -> bool:
         return False
 
 
+def _discard_tracks_log(target_path: str, restored) -> None:
+    """
+    Drop the JSONL log and dedup index beside a restored tracks file.
+
+    Backups already include the logged tracks, so leaving the live log in
+    place would merge newer tracks on top of the restored state.
+    """
+    if not isinstance(restored, dict):
+        return  # not a tracks file
+    from managers.sync_manager import tracks_index_path
+
+    for path in (tracks_log_path(target_path), tracks_index_path(target_path)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
 def get_backup_stats() -> dict:
     """
     Get statistics about backups.
@@ -1,11 +1,71 @@
 import os
-import glob
+import re
 import shutil
+import fnmatch
+import logging
 from utils.logger import log_info, log_warning, log_error
 from constants import VALID_AUDIO_EXTENSIONS
 
+# Suffixes yt-dlp and ffmpeg leave behind for unfinished downloads
+_TEMP_SUFFIXES = (".part", ".ytdl", ".temp", ".tmp", ".partial")
+_MIN_VALID_SIZE = 100 * 1024  # 100KB minimum for valid audio
 
-def cleanup_after_download(config: dict) -> dict:
+
+def _log_removed(kind: str, paths: list, directory: str):
+    """One summary line per pass; the per-item names only go to the log file at DEBUG."""
+    if not paths:
+        return
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        for path in paths:
+            logging.debug("Removed %s: %s", kind, path)
+    log_info("Removed %d %s(s) in %s", len(paths), kind, directory)
+
+
+def _scan_cleanup_candidates(directory: str) -> dict:
+    """
+    Walk directory once (bottom-up) and sort everything cleanup cares about.
+
+    Returns dict with "temp_files", "empty_dirs" (root excluded) and
+    "partial_files" (audio under _MIN_VALID_SIZE) as path lists, plus
+    "partial_sizes" mapping each partial file to its size. This is also what
+    get_cleanup_preview returns, so a preview can be handed straight to
+    cleanup_after_download.
+    """
+    found = {"temp_files": [], "empty_dirs": [], "partial_files": [], "partial_sizes": {}}
+    _scan_into(directory, found)
+    return found
+
+
+def _scan_into(path: str, found: dict) -> bool:
+    """os.scandir recursion behind _scan_cleanup_candidates; returns True if path is empty."""
+    empty = True
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return False  # unreadable; skip it like os.walk would
+    with it:
+        for entry in it:
+            empty = False
+            if entry.is_dir(follow_symlinks=False):
+                if _scan_into(entry.path, found):
+                    found["empty_dirs"].append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                low = entry.name.lower()
+                if low.endswith(_TEMP_SUFFIXES):
+                    found["temp_files"].append(entry.path)
+                elif os.path.splitext(low)[1] in VALID_AUDIO_EXTENSIONS:
+                    # DirEntry.stat() reuses what readdir already returned where it can
+                    try:
+                        size = entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+                    if size < _MIN_VALID_SIZE:
+                        found["partial_files"].append(entry.path)
+                        found["partial_sizes"][entry.path] = size
+    return empty
+
+
+def cleanup_after_download(config: dict, candidates: dict = None) -> dict:
     """
     Perform post-download cleanup operations.
     
@@ -13,6 +73,9 @@ def cleanup_after_download(config: dict) -> dict:
     - auto_cleanup: Whether to perform cleanup (must be True)
     - output_dir: Directory to clean
     
+    Pass the result of get_cleanup_preview as candidates to act on it
+    without walking output_dir again.
+    
     Returns dict with cleanup statistics.
     """
     if not config.get("auto_cleanup", True):
@@ -27,14 +90,18 @@ def cleanup_after_download(config: dict) -> dict:
         "cache_cleared": False
     }
     
+    # One traversal (or the caller's preview) feeds every pass below
+    if candidates is None and os.path.exists(output_dir):
+        candidates = _scan_cleanup_candidates(output_dir)
+    
     # Clean temporary files
-    stats["temp_files_removed"] = remove_temp_files(output_dir)
+    stats["temp_files_removed"] = remove_temp_files(output_dir, _candidates=candidates)
     
     # Remove empty directories
-    stats["empty_dirs_removed"] = remove_empty_directories(output_dir)
+    stats["empty_dirs_removed"] = remove_empty_directories(output_dir, _candidates=candidates)
     
     # Clean partial/incomplete downloads
-    stats["partial_files_removed"] = remove_partial_downloads(output_dir)
+    stats["partial_files_removed"] = remove_partial_downloads(output_dir, _candidates=candidates)
     
     # Clear yt-dlp cache (optional)
     stats["cache_cleared"] = clear_ytdlp_cache()
@@ -46,39 +113,43 @@ def cleanup_after_download(config: dict) -> dict:
     return stats
 
 
-def remove_temp_files(directory: str) -> int:
+def remove_temp_files(directory: str, _candidates: dict = None) -> int:
     """
     Remove temporary files created during downloads.
     Common patterns: .part, .ytdl, .temp, .tmp
     """
-    temp_patterns = ["*.part", "*.ytdl", "*.temp", "*.tmp", "*.partial"]
-    removed_count = 0
-    
     if not os.path.exists(directory):
         return 0
     
-    for pattern in temp_patterns:
-        for filepath in glob.glob(os.path.join(directory, "**", pattern), recursive=True):
-            try:
-                os.remove(filepath)
-                log_info(f"Removed temp file: {os.path.basename(filepath)}")
-                removed_count += 1
-            except OSError as e:
-                log_warning(f"Could not remove {filepath}: {e}")
+    if _candidates is None:
+        _candidates = _scan_cleanup_candidates(directory)
     
-    return removed_count
+    removed = []
+    for filepath in _candidates["temp_files"]:
+        try:
+            os.remove(filepath)
+            removed.append(filepath)
+        except OSError as e:
+            log_warning(f"Could not remove {filepath}: {e}")
+    
+    _log_removed("temp file", removed, directory)
+    return len(removed)
 
 
-def remove_empty_directories(directory: str) -> int:
+def remove_empty_directories(directory: str, _candidates: dict = None) -> int:
     """
     Remove empty subdirectories within the output directory.
     Does not remove the root output directory.
     """
-    removed_count = 0
-    
     if not os.path.exists(directory):
         return 0
     
+    if _candidates is not None:
+        removed = _remove_candidate_dirs(directory, _candidates)
+        _log_removed("empty folder", removed, directory)
+        return len(removed)
+    
+    removed = []
     # Walk bottom-up to remove nested empty dirs first
     for root, dirs, files in os.walk(directory, topdown=False):
         # Skip the root directory
@@ -89,42 +160,60 @@ def remove_empty_directories(directory: str) -> int:
         if not os.listdir(root):
             try:
                 os.rmdir(root)
-                log_info(f"Removed empty directory: {os.path.basename(root)}")
-                removed_count += 1
+                removed.append(root)
             except OSError as e:
                 log_warning(f"Could not remove directory {root}: {e}")
     
-    return removed_count
+    _log_removed("empty folder", removed, directory)
+    return len(removed)
 
 
-def remove_partial_downloads(directory: str) -> int:
+def _remove_candidate_dirs(directory: str, candidates: dict) -> list:
+    """
+    remove_empty_directories without a walk: try the scanned empty dirs plus the
+    folders temp files were removed from, deepest first, climbing to each
+    parent that becomes empty in turn. Returns the removed paths.
+    """
+    root = os.path.normpath(directory)
+    pending = set(candidates["empty_dirs"])
+    pending.update(os.path.dirname(p) for p in candidates["temp_files"])
+    removed = []
+    
+    for path in sorted(pending, key=lambda p: p.count(os.sep), reverse=True):
+        path = os.path.normpath(path)
+        while path != root and path.startswith(root + os.sep):
+            try:
+                os.rmdir(path)  # fails unless empty, which is exactly the test we need
+            except OSError:
+                break
+            removed.append(path)
+            path = os.path.dirname(path)
+    
+    return removed
+
+
+def remove_partial_downloads(directory: str, _candidates: dict = None) -> int:
     """
     Remove incomplete downloads (files under 100KB that aren't valid).
     This helps clean up corrupted or incomplete files.
     """
-    min_valid_size = 100 * 1024  # 100KB minimum for valid audio
     removed_count = 0
     
     if not os.path.exists(directory):
         return 0
     
-    for root, _, files in os.walk(directory):
-        for file in files:
-            filepath = os.path.join(root, file)
-            ext = os.path.splitext(file)[1].lower()
-            
-            # Only check audio files
-            if ext not in VALID_AUDIO_EXTENSIONS:
-                continue
-            
-            try:
-                size = os.path.getsize(filepath)
-                if size < min_valid_size:
-                    os.remove(filepath)
-                    log_warning(f"Removed potentially corrupted file ({size} bytes): {file}")
-                    removed_count += 1
-            except OSError as e:
-                log_warning(f"Could not check/remove {filepath}: {e}")
+    if _candidates is None:
+        _candidates = _scan_cleanup_candidates(directory)
+    
+    sizes = _candidates.get("partial_sizes", {})
+    for filepath in _candidates["partial_files"]:
+        try:
+            size = sizes[filepath] if filepath in sizes else os.path.getsize(filepath)
+            os.remove(filepath)
+            log_warning(f"Removed potentially corrupted file ({size} bytes): {os.path.basename(filepath)}")
+            removed_count += 1
+        except OSError as e:
+            log_warning(f"Could not check/remove {filepath}: {e}")
     
     return removed_count
 
@@ -173,17 +262,20 @@ def cleanup_specific_patterns(directory: str, patterns: list) -> int:
     """
     removed_count = 0
     
-    if not os.path.exists(directory):
+    if not os.path.exists(directory) or not patterns:
         return 0
     
-    for pattern in patterns:
-        for filepath in glob.glob(os.path.join(directory, "**", pattern), recursive=True):
-            try:
-                if os.path.isfile(filepath):
-                    os.remove(filepath)
+    # All patterns folded into one regex, so the tree is walked once
+    combined = re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+    
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if combined.match(name):
+                try:
+                    os.remove(os.path.join(root, name))
                     removed_count += 1
-            except OSError:
-                pass
+                except OSError:
+                    pass
     
     return removed_count
 
@@ -191,43 +283,12 @@ def cleanup_specific_patterns(directory: str, patterns: list) -> int:
 def get_cleanup_preview(config: dict) -> dict:
     """
     Preview what would be cleaned without actually removing files.
-    Useful for user confirmation.
+    Useful for user confirmation; pass the result to cleanup_after_download.
     """
     output_dir = config.get("output_dir", "music")
     
-    preview = {
-        "temp_files": [],
-        "empty_dirs": [],
-        "partial_files": []
-    }
-    
     if not os.path.exists(output_dir):
-        return preview
-    
-    # Find temp files
-    temp_patterns = ["*.part", "*.ytdl", "*.temp", "*.tmp", "*.partial"]
-    for pattern in temp_patterns:
-        for filepath in glob.glob(os.path.join(output_dir, "**", pattern), recursive=True):
-            preview["temp_files"].append(filepath)
-    
-    # Find empty directories
-    for root, dirs, files in os.walk(output_dir, topdown=False):
-        if root != output_dir and not os.listdir(root):
-            preview["empty_dirs"].append(root)
-    
-    # Find partial files
-    min_valid_size = 100 * 1024
-    for root, _, files in os.walk(output_dir):
-        for file in files:
-            filepath = os.path.join(root, file)
-            ext = os.path.splitext(file)[1].lower()
-            
-            if ext in VALID_AUDIO_EXTENSIONS:
-                try:
-                    if os.path.getsize(filepath) < min_valid_size:
-                        preview["partial_files"].append(filepath)
-                except OSError:
-                    pass
+        return {"temp_files": [], "empty_dirs": [], "partial_files": [], "partial_sizes": {}}
     
-    return preview
+    return _scan_cleanup_candidates(output_dir)
 
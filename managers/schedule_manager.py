@@ -1,7 +1,6 @@
 import schedule
 import time
 from utils.logger import log_info, log_error
-from downloader.base_downloader import batch_download
 import asyncio
 from utils.loaders import load_primary_tracks
 
@@ -11,6 +10,7 @@ def schedule_download(config):
 
     def job():
         from utils.track_checker import check_downloaded_files
+        from downloader.base_downloader import batch_download
 
         tracks = load_primary_tracks(config)
         _, pending = check_downloaded_files(config["output_dir"], tracks)
@@ -1,82 +1,339 @@
 import os
 import json
-import time
+import pickle
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from datetime import datetime
 from typing import List, Optional
 from utils.logger import log_info, log_warning, log_error
-from utils.loaders import load_exportify_tracks
+from utils.loaders import load_exportify_tracks, read_tracks_log, tracks_log_path
+from utils.json_io import dump_json, dump_json_line, load_json, write_atomic
+
+try:
+    import blake3
+except ImportError:  # optional speedup; MD5 is used otherwise
+    blake3 = None
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # optional; schedule_sync falls back to interval polling
+    Observer = None
+    FileSystemEventHandler = object
 
 # State file to track synced files
 SYNC_STATE_FILE = "data/sync_state.json"
 
+# Quiet period after the last CSV event before the watcher syncs, so a batch
+# of exports (or an editor's write-then-rename save) triggers one sync
+WATCH_DEBOUNCE_SECONDS = 1.0
+
+# Recorded with each synced file; hashes from a different algorithm never match
+HASH_ALGORITHM = "blake3" if blake3 else "md5"
+
+_HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Bumped whenever the pickled tracks index layout changes, so old ones are rebuilt
+_TRACKS_INDEX_VERSION = 2
+
+
+def _new_hasher():
+    return blake3.blake3() if blake3 else hashlib.md5()
+
+
+# Digest of zero bytes, returned for empty files without touching the hasher
+_EMPTY_HASH = _new_hasher().hexdigest()
+
 
 def get_file_hash(filepath: str) -> str:
-    """Calculate MD5 hash of a file for change detection."""
-    hasher = hashlib.md5()
-    with open(filepath, "rb") as f:
-        buf = f.read(65536)
-        while buf:
-            hasher.update(buf)
-            buf = f.read(65536)
+    """Calculate a HASH_ALGORITHM (BLAKE3, else MD5) hash of a file for change detection."""
+    with open(filepath, "rb", buffering=0) as f:
+        # A short first read means the whole file is already in hand (typical
+        # for an Exportify CSV): hash it without a size check or loop
+        data = f.read(_HASH_CHUNK_SIZE)
+        if not data:
+            return _EMPTY_HASH
+        hasher = _new_hasher()
+        hasher.update(data)
+        if len(data) < _HASH_CHUNK_SIZE:
+            return hasher.hexdigest()
+
+        # Large file: reuse one buffer instead of allocating a bytes object per chunk
+        buf = bytearray(_HASH_CHUNK_SIZE)
+        mv = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(mv[:n])
     return hasher.hexdigest()
 
 
-def load_sync_state() -> dict:
-    """Load the sync state from file."""
-    if not os.path.exists(SYNC_STATE_FILE):
-        return {"synced_files": {}, "last_sync": None}
+# Parsed sync state and the (mtime_ns, size) of SYNC_STATE_FILE it came from;
+# "dirty" means the in-memory copy has edits that flush_sync_state hasn't written yet
+_state_cache = {"stamp": None, "state": None, "dirty": False}
 
+
+def _file_stamp(path: str):
     try:
-        with open(SYNC_STATE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {"synced_files": {}, "last_sync": None}
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_sync_state() -> dict:
+    """
+    Load the sync state, reparsing SYNC_STATE_FILE only when it changed on disk.
+
+    The same dict is handed out until then, so edits made through it are
+    shared; save_sync_state / flush_sync_state write them back.
+    """
+    if _state_cache["dirty"]:
+        return _state_cache["state"]
+
+    stamp = _file_stamp(SYNC_STATE_FILE)
+    if stamp is not None and stamp == _state_cache["stamp"]:
+        return _state_cache["state"]
+
+    state = {"synced_files": {}, "last_sync": None}
+    if stamp is not None:
+        try:
+            state = load_json(SYNC_STATE_FILE)
+        except (json.JSONDecodeError, IOError):
+            pass
+    _state_cache.update(stamp=stamp, state=state, dirty=False)
+    return state
 
 
 def save_sync_state(state: dict):
     """Save the sync state to file."""
     os.makedirs(os.path.dirname(SYNC_STATE_FILE), exist_ok=True)
-    with open(SYNC_STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
+    # Losing recent state after a power cut only means a rehash, so skip the fsync
+    dump_json(state, SYNC_STATE_FILE, durable=False)
+    _state_cache.update(stamp=_file_stamp(SYNC_STATE_FILE), state=state, dirty=False)
+
+
+def _mark_sync_state_dirty(state: dict):
+    """Keep state as the in-memory sync state, to be written by the next flush_sync_state."""
+    _state_cache["state"] = state
+    _state_cache["dirty"] = True
+
+
+def flush_sync_state():
+    """Write the in-memory sync state back to SYNC_STATE_FILE if it has unsaved edits."""
+    if _state_cache["dirty"]:
+        save_sync_state(_state_cache["state"])
+
+
+def _changed_csv_entries(exportify_dir: str, synced_files: dict) -> List[tuple]:
+    """
+    (filename, filepath, stat, synced entry or None) for each CSV whose mtime
+    or size differs from its synced entry, or that has none.
+    """
+    # Single streaming pass: the name filter and d_type-based is_file() cost no
+    # syscall, and only CSVs get stat()ed. Unchanged mtime and size: trust the
+    # recorded hash without reading the file.
+    changed = []
+    with os.scandir(exportify_dir) as it:
+        for entry in it:
+            if not entry.name.lower().endswith(".csv") or not entry.is_file():
+                continue
+            st = entry.stat()
+            synced = synced_files.get(entry.name)
+            if synced and synced.get("mtime_ns") == st.st_mtime_ns and synced.get("size") == st.st_size:
+                continue
+            changed.append((entry.name, entry.path, st, synced))
+    return changed
+
+
+def detect_new_files_fast(exportify_dir: str, state: Optional[dict] = None) -> List[dict]:
+    """
+    Like detect_new_files, but judged on mtime and size alone; nothing is read or hashed.
 
+    A CSV that was touched without changing its contents is reported too, so
+    treat the result as an upper bound; the sync itself confirms by hash.
 
-def detect_new_files(exportify_dir: str) -> List[dict]:
+    Returns:
+        List of dicts with "filename", "filepath" and "is_new"
+    """
+    if not os.path.exists(exportify_dir):
+        return []
+
+    if state is None:
+        state = load_sync_state()
+    return [
+        {"filename": filename, "filepath": filepath, "is_new": synced is None}
+        for filename, filepath, _, synced in _changed_csv_entries(exportify_dir, state.get("synced_files", {}))
+    ]
+
+
+def detect_new_files(exportify_dir: str, state: Optional[dict] = None) -> List[dict]:
     """
     Detect new or modified CSV files in the exportify directory.
 
+    Args:
+        exportify_dir: Folder holding the Exportify CSVs
+        state: Sync state the caller already loaded. Stat refreshes are then
+            only marked dirty, for the caller to flush_sync_state; without it
+            the state is loaded here and saved right away.
+
     Returns:
         List of dicts with file info for new/modified files
     """
     if not os.path.exists(exportify_dir):
         return []
 
-    state = load_sync_state()
+    own_state = state is None
+    if own_state:
+        state = load_sync_state()
     synced_files = state.get("synced_files", {})
 
     new_files = []
+    refreshed = False
+    to_hash = _changed_csv_entries(exportify_dir, synced_files)
+
+    # hashlib and file reads release the GIL, so hash the rest in parallel;
+    # map() keeps the directory order
+    paths = [filepath for _, filepath, _, _ in to_hash]
+    if len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1, len(paths))) as ex:
+            hashes = list(ex.map(get_file_hash, paths))
+    else:
+        hashes = [get_file_hash(p) for p in paths]
 
-    for filename in os.listdir(exportify_dir):
-        if not filename.lower().endswith(".csv"):
-            continue
-
-        filepath = os.path.join(exportify_dir, filename)
-        current_hash = get_file_hash(filepath)
-
-        # Check if file is new or modified
-        if filename not in synced_files or synced_files[filename]["hash"] != current_hash:
+    for (filename, filepath, st, synced), current_hash in zip(to_hash, hashes):
+        # Check if file is new or modified (entries hashed with another algorithm
+        # can't be compared, so they count as modified once)
+        if synced is None or synced.get("algo", "md5") != HASH_ALGORITHM or synced["hash"] != current_hash:
             new_files.append(
                 {
                     "filename": filename,
                     "filepath": filepath,
                     "hash": current_hash,
-                    "is_new": filename not in synced_files,
+                    "mtime_ns": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "is_new": synced is None,
                 }
             )
+        else:
+            # Touched but identical: remember the new stat so it isn't rehashed next time
+            synced["mtime_ns"] = st.st_mtime_ns
+            synced["size"] = st.st_size
+            refreshed = True
+
+    if refreshed:
+        if own_state:
+            save_sync_state(state)
+        else:
+            _mark_sync_state_dirty(state)
 
     return new_files
 
 
+def tracks_index_path(tracks_file: str) -> str:
+    """Pickled dedup index of a tracks JSON file (data/tracks.json -> data/tracks_index.pickle)."""
+    return os.path.splitext(tracks_file)[0] + "_index.pickle"
+
+
+def _tracks_stamp(tracks_file: str) -> tuple:
+    return _file_stamp(tracks_file), _file_stamp(tracks_log_path(tracks_file))
+
+
+def _load_tracks_index(tracks_file: str) -> dict:
+    """
+    Return {"ids", "json_count", "log_count"} for tracks_file and its JSONL log.
+
+    Read from the pickled index when it was written against the current
+    (mtime_ns, size) of both files; otherwise rebuilt from the tracks
+    themselves, which is the only O(total tracks) path.
+    """
+    try:
+        with open(tracks_index_path(tracks_file), "rb") as f:
+            index = pickle.load(f)
+        if index.get("version") == _TRACKS_INDEX_VERSION and index.get("stamp") == _tracks_stamp(tracks_file):
+            return index
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+        pass  # missing, unreadable or from an older layout: rebuild
+
+    existing_tracks = []
+    if os.path.exists(tracks_file):
+        try:
+            existing_tracks = load_json(tracks_file).get("tracks", [])
+        except (json.JSONDecodeError, IOError):
+            existing_tracks = []
+    logged_tracks = read_tracks_log(tracks_file)
+
+    ids = {(t.get("artist", "").casefold(), t.get("track", "").casefold()) for t in chain(existing_tracks, logged_tracks)}
+    return {
+        "version": _TRACKS_INDEX_VERSION,
+        "ids": ids,
+        "json_count": len(existing_tracks),
+        "log_count": len(logged_tracks),
+    }
+
+
+def _save_tracks_index(tracks_file: str, index: dict):
+    """Pickle index, stamped with the files it describes; a failed write just means a rebuild next time."""
+    index["stamp"] = _tracks_stamp(tracks_file)
+    try:
+        write_atomic(
+            pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL), tracks_index_path(tracks_file), durable=False
+        )
+    except OSError as e:
+        log_warning(f"Could not save tracks index: {e}")
+
+
+def _save_new_tracks(tracks_file: str, index: dict, added_tracks: list, config: dict, auto_backup: bool):
+    """
+    Persist newly synced tracks and update index's counts to match.
+
+    New tracks are appended to the JSONL log next to tracks_file, so a sync
+    writes O(new tracks). Once the log holds as many tracks as tracks_file
+    itself (or tracks_file doesn't exist yet) everything is compacted back
+    into tracks_file, which keeps total rewrite cost linear.
+    """
+    log_path = tracks_log_path(tracks_file)
+    os.makedirs(os.path.dirname(tracks_file) or ".", exist_ok=True)
+
+    if os.path.exists(tracks_file) and index["log_count"] + len(added_tracks) < index["json_count"]:
+        if added_tracks:
+            with open(log_path, "ab") as f:
+                f.write(b"".join(dump_json_line(t) for t in added_tracks))
+            index["log_count"] += len(added_tracks)
+        return
+
+    # Compaction is the one place the full track list is needed
+    existing_tracks = []
+    if os.path.exists(tracks_file):
+        try:
+            existing_tracks = load_json(tracks_file).get("tracks", [])
+        except (json.JSONDecodeError, IOError):
+            existing_tracks = []
+    all_tracks = existing_tracks + read_tracks_log(tracks_file) + added_tracks
+
+    # Backup tracks.json before modifying
+    if auto_backup and os.path.exists(tracks_file):
+        try:
+            from managers.backup_manager import backup_json_file
+
+            backup_json_file(tracks_file, config)
+        except ImportError:
+            pass
+
+    # Compact: on a large library pretty-printing dominates the write and
+    # roughly a quarter of the bytes are indentation
+    dump_json({"tracks": all_tracks}, tracks_file, indent=None)
+    try:
+        os.remove(log_path)
+    except FileNotFoundError:
+        pass
+    index["json_count"] = len(all_tracks)
+    index["log_count"] = 0
+
+
 def sync_exportify_folder(config: dict) -> dict:
     """
     Sync the exportify folder.
@@ -88,7 +345,8 @@ def sync_exportify_folder(config: dict) -> dict:
 
     Backward compatibility:
     - If tracks_file is a JSON file AND sync_write_tracks_json is enabled,
-      this will also merge new tracks into tracks.json.
+      this will also merge new tracks into tracks.json (appended to
+      tracks.jsonl first, see _save_new_tracks).
     """
     exportify_dir = config.get("exportify_watch_folder", "data/exportify")
     tracks_file = config.get("tracks_file", "data/tracks.json")
@@ -114,93 +372,101 @@ def sync_exportify_folder(config: dict) -> dict:
         results["errors"].append(f"Directory not found: {exportify_dir}")
         return results
 
+    # Load sync state once; everything below edits it and it is written once at the end
+    state = load_sync_state()
+
     # Detect new/modified files
-    new_files = detect_new_files(exportify_dir)
+    new_files = detect_new_files(exportify_dir, state=state)
 
     if not new_files:
+        flush_sync_state()
         log_info("No new or modified files to sync")
         return results
 
     log_info(f"Found {len(new_files)} file(s) to sync")
 
-    # Load existing tracks only if we are updating tracks.json
-    existing_tracks = []
+    # Identifiers of the tracks already in tracks.json and its JSONL log, for
+    # deduplication; only needed if we are updating tracks.json
+    added_tracks = []
+    index = None
     existing_ids = set()
 
-    if should_update_tracks_json and os.path.exists(tracks_file):
-        # Backup tracks.json before modifying
-        if auto_backup:
+    if should_update_tracks_json:
+        index = _load_tracks_index(tracks_file)
+        existing_ids = index["ids"]
+
+    # Process each new file directly, collecting state entries and counts
+    # locally and splicing them into state / results once afterwards
+    new_state_entries = {}
+    new_track_count = 0
+    new_file_count = 0
+    updated_file_count = 0
+    seen = existing_ids.__contains__
+    mark_seen = existing_ids.add
+    add_track = added_tracks.append
+
+    # Read and parse the CSVs on a small pool while this thread dedups them.
+    # Results are taken in new_files order, so which file a duplicate track is
+    # credited to stays deterministic, and existing_ids is only touched here.
+    with ThreadPoolExecutor(max_workers=min(4, len(new_files))) as ex:
+        futures = [ex.submit(load_exportify_tracks, fi["filepath"]) for fi in new_files]
+        for file_info, future in zip(new_files, futures):
             try:
-                from managers.backup_manager import backup_json_file
-
-                backup_json_file(tracks_file, config)
-            except ImportError:
-                pass
-
-        try:
-            with open(tracks_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                existing_tracks = data.get("tracks", [])
-        except (json.JSONDecodeError, IOError):
-            existing_tracks = []
+                csv_tracks = future.result()
+
+                added_count = 0
+                for track in csv_tracks:
+                    artist = track.get("artist", "")
+                    name = track.get("track", "")
+                    track_id = (artist.casefold(), name.casefold())
+                    if seen(track_id):
+                        continue
+
+                    mark_seen(track_id)
+                    added_count += 1
+
+                    if should_update_tracks_json:
+                        add_track(
+                            {
+                                "artist": artist,
+                                "album": track.get("album", ""),
+                                "track": name,
+                                "uri": track.get("uri", ""),
+                            }
+                        )
+
+                new_track_count += added_count
+                log_info(f"Synced {file_info['filename']}: {added_count} new tracks")
+
+                # Sync state entry for this file
+                new_state_entries[file_info["filename"]] = {
+                    "hash": file_info["hash"],
+                    "algo": HASH_ALGORITHM,
+                    "mtime_ns": file_info["mtime_ns"],
+                    "size": file_info["size"],
+                    "synced_at": datetime.now().isoformat(),
+                }
 
-    # Create set of existing track identifiers for deduplication
-    for t in existing_tracks:
-        track_id = f"{t.get('artist', '').casefold()}|{t.get('track', '').casefold()}"
-        existing_ids.add(track_id)
+                if file_info["is_new"]:
+                    new_file_count += 1
+                else:
+                    updated_file_count += 1
 
-    # Load sync state
-    state = load_sync_state()
+            except Exception as e:
+                error_msg = f"Error syncing {file_info['filename']}: {e}"
+                log_error(error_msg)
+                results["errors"].append(error_msg)
 
-    # Process each new file directly
-    for file_info in new_files:
-        try:
-            csv_tracks = load_exportify_tracks(file_info["filepath"])
-
-            added_count = 0
-            for track in csv_tracks:
-                track_id = f"{track.get('artist', '').casefold()}|{track.get('track', '').casefold()}"
-                if track_id in existing_ids:
-                    continue
-
-                existing_ids.add(track_id)
-                added_count += 1
-
-                if should_update_tracks_json:
-                    existing_tracks.append(
-                        {
-                            "artist": track.get("artist", ""),
-                            "album": track.get("album", ""),
-                            "track": track.get("track", ""),
-                            "uri": track.get("uri", ""),
-                        }
-                    )
-
-            results["new_tracks"] += added_count
-            log_info(f"Synced {file_info['filename']}: {added_count} new tracks")
-
-            # Update sync state for this file
-            state["synced_files"][file_info["filename"]] = {
-                "hash": file_info["hash"],
-                "synced_at": datetime.now().isoformat(),
-            }
-
-            if file_info["is_new"]:
-                results["new_files"] += 1
-            else:
-                results["updated_files"] += 1
-
-        except Exception as e:
-            error_msg = f"Error syncing {file_info['filename']}: {e}"
-            log_error(error_msg)
-            results["errors"].append(error_msg)
+    state["synced_files"].update(new_state_entries)
+    results["new_tracks"] = new_track_count
+    results["new_files"] = new_file_count
+    results["updated_files"] = updated_file_count
 
     # Save updated tracks.json (optional)
     if should_update_tracks_json:
         try:
-            os.makedirs(os.path.dirname(tracks_file) or ".", exist_ok=True)
-            with open(tracks_file, "w", encoding="utf-8") as f:
-                json.dump({"tracks": existing_tracks}, f, indent=2)
+            _save_new_tracks(tracks_file, index, added_tracks, config, auto_backup)
+            _save_tracks_index(tracks_file, index)
             results["tracks_file_updated"] = True
             log_info(f"Updated {tracks_file} with {results['new_tracks']} new tracks")
         except IOError as e:
@@ -220,37 +486,107 @@ def sync_exportify_folder(config: dict) -> dict:
     return results
 
 
+class _CsvEventHandler(FileSystemEventHandler):
+    """Calls on_change (debounced) when a .csv in the watched folder is created, modified or renamed in."""
+
+    def __init__(self, on_change):
+        super().__init__()
+        self._on_change = on_change
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def _touch(self, path: str):
+        if not path.lower().endswith(".csv"):
+            return
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(WATCH_DEBOUNCE_SECONDS, self._on_change)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._touch(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._touch(event.dest_path)
+
+    def cancel(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+
+
 def schedule_sync(config: dict, interval_seconds: Optional[int] = None):
     """
-    Run sync on a schedule.
+    Keep the Exportify folder synced until Ctrl+C.
+
+    With watchdog installed, the folder is watched for CSV changes (inotify /
+    FSEvents / ReadDirectoryChangesW) and synced shortly after each one;
+    otherwise sync runs on a fixed interval.
 
     Args:
         config: Configuration dict
-        interval_seconds: Sync interval in seconds (overrides config)
+        interval_seconds: Sync interval in seconds for the polling fallback (overrides config)
     """
-    import schedule
-
-    interval = interval_seconds or config.get("auto_sync_interval", 3600)
+    sync_lock = threading.Lock()
 
     def sync_job():
-        log_info("Running scheduled sync...")
-        results = sync_exportify_folder(config)
+        # Debounce timers run on their own threads; never sync twice at once
+        with sync_lock:
+            log_info("Running scheduled sync...")
+            results = sync_exportify_folder(config)
         if results["new_tracks"] > 0:
             log_info(f"Scheduled sync complete: {results['new_tracks']} new tracks added")
         else:
             log_info("Scheduled sync complete: no new tracks")
 
-    # Schedule recurring sync
-    schedule.every(interval).seconds.do(sync_job)
+    exportify_dir = config.get("exportify_watch_folder", "data/exportify")
+    if Observer is not None and os.path.isdir(exportify_dir):
+        _watch_sync(exportify_dir, sync_job)
+        return
+
+    interval = interval_seconds or config.get("auto_sync_interval", 3600)
 
     log_info(f"Sync scheduled every {interval} seconds. Press Ctrl+C to stop.")
 
+    # A single fixed-interval job: sleep the whole interval in one wait
+    # instead of waking every second to poll a scheduler
+    stop = threading.Event()
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+        while not stop.wait(interval):
+            sync_job()
+    except KeyboardInterrupt:
+        stop.set()
+        log_info("Sync scheduler stopped")
+
+
+def _watch_sync(exportify_dir: str, sync_job):
+    """schedule_sync's watchdog path: sync once, then only when a CSV changes."""
+    handler = _CsvEventHandler(sync_job)
+    observer = Observer()
+    observer.schedule(handler, exportify_dir, recursive=False)
+    observer.start()
+
+    log_info(f"Watching {exportify_dir} for CSV changes. Press Ctrl+C to stop.")
+
+    try:
+        # Catch up on anything that changed while nobody was watching
+        sync_job()
+        while observer.is_alive():
+            observer.join(1)
     except KeyboardInterrupt:
         log_info("Sync scheduler stopped")
+    finally:
+        handler.cancel()
+        observer.stop()
+        observer.join()
 
 
 def run_sync_once(config: dict) -> dict:
@@ -276,8 +612,9 @@ def get_sync_status(config: dict) -> dict:
         "sync_interval": config.get("auto_sync_interval", 3600),
     }
 
-    # Check for pending files
-    pending = detect_new_files(exportify_dir)
+    # Pending files by mtime/size against the state already loaded above;
+    # only the sync itself needs to read and hash them
+    pending = detect_new_files_fast(exportify_dir, state=state)
     status["pending_files"] = [f["filename"] for f in pending]
     status["pending_count"] = len(pending)
 
@@ -1,11 +1,9 @@
 import questionary
-from managers.resume_manager import resume_batch
-from managers.schedule_manager import schedule_download
-from managers.sync_manager import run_sync_once, get_sync_status, schedule_sync, clear_sync_state
-from managers.backup_manager import backup_all, list_backups, get_backup_stats
-from managers.cleanup_manager import cleanup_after_download, get_cleanup_preview
 from utils.logger import log_info, log_success, log_error
 
+# Managers are imported inside the handlers that use them, so opening the
+# menu (or just going Back) doesn't load every manager and its dependencies.
+
 
 def automation_menu(config):
     """
@@ -28,9 +26,11 @@ def automation_menu(config):
         ).ask()
 
         if choice == "Resume paused batch download":
+            from managers.resume_manager import resume_batch
             resume_batch(config)
 
         elif choice == "Schedule a download job":
+            from managers.schedule_manager import schedule_download
             schedule_download(config)
 
         elif choice == "Sync exportify folder now":
@@ -57,6 +57,8 @@ def automation_menu(config):
 
 def sync_now(config):
     """Run a sync operation immediately."""
+    from managers.sync_manager import run_sync_once, get_sync_status
+
     log_info("Starting sync...")
     
     # Show current status first
@@ -86,6 +88,8 @@ def sync_now(config):
 
 def schedule_sync_menu(config):
     """Start the scheduled sync process."""
+    from managers.sync_manager import get_sync_status, schedule_sync
+
     status = get_sync_status(config)
     
     print(f"\nCurrent sync interval: {status['sync_interval']} seconds")
@@ -107,6 +111,8 @@ def schedule_sync_menu(config):
 
 def run_cleanup_menu(config):
     """Run cleanup with preview option."""
+    from managers.cleanup_manager import cleanup_after_download, get_cleanup_preview
+
     # Show preview first
     preview = get_cleanup_preview(config)
     
@@ -151,7 +157,7 @@ def run_cleanup_menu(config):
     ).ask()
     
     if confirm:
-        results = cleanup_after_download(config)
+        results = cleanup_after_download(config, candidates=preview)
         total_removed = (
             results.get("temp_files_removed", 0) +
             results.get("empty_dirs_removed", 0) +
@@ -162,6 +168,8 @@ def run_cleanup_menu(config):
 
 def backup_now(config):
     """Run backup of all data files."""
+    from managers.backup_manager import backup_all
+
     confirm = questionary.confirm("Backup all data files now?", default=True).ask()
     
     if confirm:
@@ -177,6 +185,8 @@ def backup_now(config):
 
 def view_backup_status():
     """Display backup statistics."""
+    from managers.backup_manager import list_backups, get_backup_stats
+
     stats = get_backup_stats()
     
     print("\n" + "=" * 50)
@@ -209,6 +219,8 @@ def view_backup_status():
 
 def clear_sync_menu():
     """Clear sync state to force re-sync of all files."""
+    from managers.sync_manager import clear_sync_state
+
     confirm = questionary.confirm(
         "Clear sync state? This will cause all exportify files to be re-synced on next run.",
         default=False
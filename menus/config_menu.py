@@ -59,8 +59,8 @@ def view_config(config: dict):
     # Group settings by category
     categories = {
         "File Paths": ["tracks_file", "playlists_file", "output_dir", "exportify_watch_folder"],
-        "Download Settings": ["audio_format", "sleep_between", "average_download_time"],
-        "Retry Settings": ["retry_attempts", "retry_delay"],
+        "Download Settings": ["audio_format", "sleep_between", "average_download_time", "max_parallel_playlists"],
+        "Retry Settings": ["retry_attempts", "retry_delay", "retry_max_delay", "retry_concurrency"],
         "Automation": ["auto_cleanup", "auto_backup", "max_backups", "auto_sync_enabled", "auto_sync_interval"],
         "Profile": ["profile"]
     }
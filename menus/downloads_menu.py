@@ -1,5 +1,7 @@
+import atexit
 import asyncio
 import questionary
+from concurrent.futures import ThreadPoolExecutor
 from utils.logger import log_info, log_warning, log_error
 from utils.track_checker import (
     check_downloaded_files,
@@ -7,35 +9,242 @@ from utils.track_checker import (
     track_key,
 )
 from utils.loaders import load_primary_tracks, load_playlists, load_exportify_playlists, load_exportify_tracks
-from downloader.base_downloader import download_track, batch_download
-from downloader.playlist_download import download_playlist
-from downloader.youtube_link_downloader import download_from_link, download_from_playlist
-from menus.song_selection_menu import select_songs_for_playlist
 import os
+import time
+import pickle
+import threading
+from constants import EXISTING_KEYS_CACHE_FILE, VALID_AUDIO_EXTENSIONS
+from utils.json_io import write_atomic
+
+# yt-dlp processes shared by every playlist in one download run (batch_download's default)
+PLAYLIST_DOWNLOAD_WORKERS = 4
+
+# Downloaders and the song picker are imported in the branches that use them,
+# so rendering the menu doesn't load yt-dlp/mutagen-backed modules up front.
 
 
 def _sanitize_playlist_name(name: str) -> str:
     return (name or "").replace("/", "-").strip()
 
 
+def _playlist_dir(output_dir: str, name: str) -> str:
+    """Folder a playlist downloads into (output_dir/<sanitized name>)."""
+    return os.path.join(output_dir, _sanitize_playlist_name(name))
+
+
 def _normalize_legacy_playlist_tracks(pl: dict) -> list:
     """Normalize legacy playlists.json playlist items into [{'artist','track'}, ...]."""
-    tracks = []
-    for item in pl.get("items", []) or []:
-        t = item.get("track") if isinstance(item, dict) else None
-        if not t:
-            continue
-        artist = (t.get("artistName") or "").strip()
-        name = (t.get("trackName") or "").strip()
-        if artist and name:
-            tracks.append({"artist": artist, "track": name})
-    return tracks
+    # One comprehension over the items; the single-element tuples bind the
+    # track and its stripped fields once per item instead of re-fetching them
+    return [
+        {"artist": artist, "track": name}
+        for item in pl.get("items") or []
+        if isinstance(item, dict)
+        for t in (item.get("track"),)
+        if t
+        for artist, name in (((t.get("artistName") or "").strip(), (t.get("trackName") or "").strip()),)
+        if artist and name
+    ]
+
+
+# Bump when track_key / parse_track_filename change what a folder's key set holds
+_KEYS_CACHE_VERSION = 1
+
+# A scan taken within this long of the folder's mtime may have raced a file
+# landing in the same mtime tick (FAT/exFAT keep 2 s, SMB shares can be coarse),
+# so it isn't trusted until a later scan confirms it, as git does for racy-clean entries
+_RACY_WINDOW_NS = 2_000_000_000
+
+# {folder: (mtime_ns, scanned_at_ns, frozenset of track keys)}, loaded from
+# EXISTING_KEYS_CACHE_FILE on first use and written back when the downloads menu exits
+_keys_cache = {"entries": None, "dirty": False}
+# The warmup thread, _load_tracks_and_existing and the prefetch pool can all
+# reach the first load together; only one of them may install the dict
+_keys_cache_lock = threading.Lock()
+
+
+def _keys_cache_format() -> tuple:
+    """Everything the cached key sets depend on besides the folders themselves."""
+    return _KEYS_CACHE_VERSION, tuple(sorted(VALID_AUDIO_EXTENSIONS))
+
+
+def _keys_cache_entries() -> dict:
+    if _keys_cache["entries"] is not None:
+        return _keys_cache["entries"]
+    with _keys_cache_lock:
+        if _keys_cache["entries"] is None:
+            _keys_cache["entries"] = _read_keys_cache()
+    return _keys_cache["entries"]
+
+
+def _read_keys_cache() -> dict:
+    """EXISTING_KEYS_CACHE_FILE's entries, or {} if it's missing, unreadable or in another format."""
+    try:
+        with open(EXISTING_KEYS_CACHE_FILE, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+        return {}  # missing or unreadable: start empty
+    if isinstance(data, dict) and data.get("format") == _keys_cache_format():
+        entries = data.get("entries")
+        if isinstance(entries, dict):
+            return entries
+    return {}  # from an older layout
+
+
+def _save_keys_cache():
+    """Persist the folder scan cache if this session added to it; failure just means rescans next time."""
+    if not _keys_cache["dirty"]:
+        return
+    try:
+        os.makedirs(os.path.dirname(EXISTING_KEYS_CACHE_FILE), exist_ok=True)
+        data = pickle.dumps(
+            {"format": _keys_cache_format(), "entries": dict(_keys_cache["entries"])},
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        write_atomic(data, EXISTING_KEYS_CACHE_FILE, durable=False)
+        _keys_cache["dirty"] = False
+    except OSError as e:
+        log_warning(f"Could not save folder scan cache: {e}")
+
+
+def _existing_keys(dirpath: str) -> frozenset:
+    """
+    existing_track_keys_in_dir, memoized on the folder's mtime (across sessions).
+
+    Adding, removing or renaming a file bumps the directory mtime, so a folder a
+    download has since written to is rescanned; an unchanged one is free unless
+    its scan was taken within _RACY_WINDOW_NS of that mtime.
+    """
+    try:
+        mtime_ns = os.stat(dirpath).st_mtime_ns
+    except OSError:
+        return frozenset()  # missing folder: nothing downloaded yet
+    entries = _keys_cache_entries()
+    cached = entries.get(dirpath)
+    if cached is not None and cached[0] == mtime_ns and cached[1] - mtime_ns >= _RACY_WINDOW_NS:
+        return cached[2]
+    # Taken before listing, so a file that lands mid-scan keeps the entry racy
+    scanned_at_ns = time.time_ns()
+    keys = frozenset(existing_track_keys_in_dir(dirpath))
+    entries[dirpath] = (mtime_ns, scanned_at_ns, keys)
+    _keys_cache["dirty"] = True
+    return keys
+
+
+def _load_tracks_and_existing(config) -> tuple:
+    """Run load_primary_tracks and the output_dir scan side by side; returns (tracks, existing_keys)."""
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        keys_future = ex.submit(_existing_keys, config["output_dir"])
+        tracks = load_primary_tracks(config)
+        return tracks, keys_future.result()
+
+
+def _prefetch_existing_keys(output_dir: str, playlists: list) -> dict:
+    """Start scanning every playlist's folder in the background; returns {name: Future of its key set}."""
+    dirs = {pl["name"]: _playlist_dir(output_dir, pl["name"]) for pl in playlists}
+    # One scan per distinct folder (names can sanitize to the same one), bounded
+    # so dozens of playlists on a NAS don't all hit it at once
+    unique_dirs = set(dirs.values())
+    ex = ThreadPoolExecutor(max_workers=min(8, len(unique_dirs)))
+    by_dir = {d: ex.submit(_existing_keys, d) for d in unique_dirs}
+    ex.shutdown(wait=False)  # queued scans still run; threads exit once they're done
+    return {name: by_dir[d] for name, d in dirs.items()}
+
+
+# One event loop for the whole session; see _run_async
+_event_loop = {"loop": None}
+
+
+def _run_async(coro):
+    """
+    Run coro to completion on a session-wide event loop.
+
+    Unlike asyncio.run, the loop (and the default executor threads behind
+    asyncio.to_thread) is reused by every download started from this menu.
+    Whatever the coroutine leaves behind is cancelled, as asyncio.run would,
+    so an interrupted download can't resume during the next one.
+    """
+    loop = _event_loop["loop"]
+    if loop is None or loop.is_closed():
+        loop = _event_loop["loop"] = asyncio.new_event_loop()
+        atexit.register(loop.close)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        leftover = asyncio.all_tasks(loop)
+        for task in leftover:
+            task.cancel()
+        if leftover:
+            loop.run_until_complete(asyncio.gather(*leftover, return_exceptions=True))
+
+
+def _confirm_jobs(jobs: list) -> bool:
+    """One confirmation for every selected playlist, asked before any download starts."""
+    for playlist, tracks in jobs:
+        log_info(f"  {playlist['name']}: {len(tracks)} tracks")
+    total = sum(len(tracks) for _, tracks in jobs)
+    confirm = questionary.confirm(f"Download {total} selected tracks from {len(jobs)} playlist(s)?").ask()
+    if not confirm:
+        log_info("❌ Skipped all selected playlists")
+    return bool(confirm)
+
+
+async def _download_playlists(jobs: list, config: dict):
+    """Download (playlist, tracks) jobs in one event loop, up to max_parallel_playlists at a time."""
+    from downloader.playlist_download import download_playlist
+
+    workers = max(1, min(config.get("max_parallel_playlists", 1), len(jobs)))
+    # Bounded so the producer only stays a few playlists ahead of the downloaders
+    queue = asyncio.Queue(maxsize=workers)
+    # One yt-dlp budget for all of them: parallel playlists overlap each other's
+    # gaps instead of multiplying the process count (and the throttling) by N
+    download_sem = asyncio.Semaphore(PLAYLIST_DOWNLOAD_WORKERS)
+
+    async def producer():
+        for job in jobs:
+            await queue.put(job)
+        for _ in range(workers):
+            await queue.put(None)  # one stop marker per consumer
+
+    async def consumer():
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            playlist, tracks = job
+            # One playlist failing shouldn't abandon the others
+            try:
+                await download_playlist(
+                    playlist["name"],
+                    tracks,
+                    config["output_dir"],
+                    config["audio_format"],
+                    config["sleep_between"],
+                    sem=download_sem,
+                )
+            except Exception as e:
+                log_error(f"Playlist download failed: {playlist['name']} - {e}")
+
+    await asyncio.gather(producer(), *(consumer() for _ in range(workers)))
 
 
 def downloads_menu(config):
     """
     Displays the Downloads menu and handles related actions.
     """
+    try:
+        _downloads_menu(config)
+    finally:
+        _save_keys_cache()
+
+
+def _downloads_menu(config):
+    # Start scanning output_dir while the user reads the menu; both "Download all
+    # pending" branches then get it from _existing_keys' cache
+    warmup = ThreadPoolExecutor(max_workers=1)
+    warmup.submit(_existing_keys, config["output_dir"])
+    warmup.shutdown(wait=False)
+
     choice = questionary.select(
         "📥 Downloads Menu — What would you like to do?",
         choices=[
@@ -50,20 +259,23 @@ def downloads_menu(config):
     ).ask()
 
     if choice == "Download all pending (sequential) - Works with CSV and JSON sources":
-        # Get tracks from the appropriate source based on configuration
-        tracks = load_primary_tracks(config)
+        # Get tracks from the appropriate source based on configuration,
+        # while output_dir is scanned for what's already there
+        tracks, existing = _load_tracks_and_existing(config)
         
         if not tracks:
             log_warning("No tracks found. Please check your configuration and source files.")
             return
             
-        _, pending = check_downloaded_files(config["output_dir"], tracks)
+        _, pending = check_downloaded_files(config["output_dir"], tracks, existing_keys=existing)
         log_info(f"Total tracks: {len(tracks)} | Pending: {len(pending)}")
         
         if not pending:
             log_info("✅ All tracks already downloaded. Nothing to do.")
             return
             
+        from downloader.base_downloader import download_track
+
         log_info(f"Downloading {len(pending)} tracks sequentially...")
         for t in pending:
             download_track(
@@ -75,22 +287,25 @@ def downloads_menu(config):
             )
 
     elif choice == "Download all pending (batch async) - Works with CSV and JSON sources":
-        # Get tracks from the appropriate source based on configuration
-        tracks = load_primary_tracks(config)
+        # Get tracks from the appropriate source based on configuration,
+        # while output_dir is scanned for what's already there
+        tracks, existing = _load_tracks_and_existing(config)
         
         if not tracks:
             log_warning("No tracks found. Please check your configuration and source files.")
             return
             
-        _, pending = check_downloaded_files(config["output_dir"], tracks)
+        _, pending = check_downloaded_files(config["output_dir"], tracks, existing_keys=existing)
         log_info(f"Total tracks: {len(tracks)} | Pending: {len(pending)}")
         
         if not pending:
             log_info("✅ All tracks already downloaded. Nothing to do.")
             return
             
+        from downloader.base_downloader import batch_download
+
         log_info(f"Downloading {len(pending)} tracks in batch async mode...")
-        asyncio.run(batch_download(pending, config["output_dir"], config["audio_format"]))
+        _run_async(batch_download(pending, config["output_dir"], config["audio_format"]))
 
     elif choice == "Search & Download a single track":
         # Ask for artist
@@ -112,6 +327,8 @@ def downloads_menu(config):
             log_info(f"No artist provided. Using random artist: {artist}")
 
         # Download track
+        from downloader.base_downloader import download_track
+
         download_track(
             artist,
             song,
@@ -137,15 +354,17 @@ def downloads_menu(config):
             return
 
         # Pending playlist list is based on missing songs in each playlist destination folder.
+        # The folders are scanned concurrently; _existing_keys serves the same results below.
+        existing_by_name = {
+            name: future.result()
+            for name, future in _prefetch_existing_keys(config["output_dir"], playlists).items()
+        }
+        # Each playlist's track keys, built once and reused for the exists count below
+        keys_by_name = {pl["name"]: {track_key(t) for t in pl["tracks"]} for pl in playlists}
         pending = []
         for pl in playlists:
-            playlist_dir = os.path.join(config["output_dir"], _sanitize_playlist_name(pl["name"]))
-            existing = existing_track_keys_in_dir(playlist_dir)
-            missing_count = 0
-            for t in pl["tracks"]:
-                if track_key(t) not in existing:
-                    missing_count += 1
-            if missing_count > 0:
+            # Pending if any of its tracks is missing: one C-level set difference
+            if keys_by_name[pl["name"]] - existing_by_name[pl["name"]]:
                 pending.append(pl)
 
         if not pending:
@@ -174,10 +393,15 @@ def downloads_menu(config):
             # Map selected names back to playlist objects
             to_download = [pl for pl in pending if pl["name"] in selected_names]
 
+        # Selections are collected first and confirmed once, then every playlist downloads in one event loop
+        from menus.song_selection_menu import select_songs_for_playlist
+
+        jobs = []
         for playlist in to_download:
-            playlist_dir = os.path.join(config["output_dir"], _sanitize_playlist_name(playlist["name"]))
-            existing = existing_track_keys_in_dir(playlist_dir)
-            exists_count = sum(1 for t in playlist["tracks"] if track_key(t) in existing)
+            playlist_dir = _playlist_dir(config["output_dir"], playlist["name"])
+            # Cache hit unless the folder changed since the scan above
+            existing = _existing_keys(playlist_dir)
+            exists_count = len(keys_by_name[playlist["name"]] & existing)
 
             log_info(f"Playlist: {playlist['name']}")
             log_info(f"  Total tracks: {len(playlist['tracks'])}")
@@ -187,28 +411,17 @@ def downloads_menu(config):
                 playlist_name=playlist["name"],
                 tracks=playlist["tracks"],
                 playlist_dir=playlist_dir,
+                existing_keys=existing,
             )
 
             if not selected_tracks:
                 log_info(f"❌ Skipped playlist: {playlist['name']}")
                 continue
 
-            confirm = questionary.confirm(
-                f"Download {len(selected_tracks)} selected tracks into '{playlist['name']}'?"
-            ).ask()
-            if not confirm:
-                log_info(f"❌ Skipped playlist: {playlist['name']}")
-                continue
+            jobs.append((playlist, selected_tracks))
 
-            asyncio.run(
-                download_playlist(
-                    playlist["name"],
-                    selected_tracks,
-                    config["output_dir"],
-                    config["audio_format"],
-                    config["sleep_between"],
-                )
-            )
+        if jobs and _confirm_jobs(jobs):
+            _run_async(_download_playlists(jobs, config))
 
     elif choice == "Download from Exportify CSV folder":
         exportify_dir = config.get("exportify_watch_folder", "data/exportify")
@@ -218,6 +431,9 @@ def downloads_menu(config):
             log_info("No CSV playlists found in exportify folder.")
             return
 
+        # Scan the playlist folders (warming _existing_keys) while the user is choosing
+        _prefetch_existing_keys(config["output_dir"], playlists)
+
         choices = [
             questionary.Choice(title=f"{pl['name']} ({len(pl['tracks'])} tracks)", value=pl["name"])
             for pl in playlists
@@ -258,13 +474,18 @@ def downloads_menu(config):
             else:
                 return
 
+        playlists_by_name = {pl["name"]: pl for pl in playlists}
+        # Selections are collected first and confirmed once, then every playlist downloads in one event loop
+        from menus.song_selection_menu import select_songs_for_playlist
+
+        jobs = []
         for name in selected_names:
-            playlist = next(pl for pl in playlists if pl["name"] == name)
+            playlist = playlists_by_name[name]
 
             # IMPORTANT: playlist downloads go into music/<playlist>/, so existence checks must use that folder.
-            playlist_dir = os.path.join(config["output_dir"], _sanitize_playlist_name(playlist["name"]))
-            existing = existing_track_keys_in_dir(playlist_dir)
-            exists_count = sum(1 for t in playlist["tracks"] if track_key(t) in existing)
+            playlist_dir = _playlist_dir(config["output_dir"], playlist["name"])
+            existing = _existing_keys(playlist_dir)
+            exists_count = len({track_key(t) for t in playlist["tracks"]} & existing)
 
             log_info(f"Playlist: {playlist['name']}")
             log_info(f"  Total tracks: {len(playlist['tracks'])}")
@@ -274,29 +495,17 @@ def downloads_menu(config):
                 playlist_name=playlist["name"],
                 tracks=playlist["tracks"],
                 playlist_dir=playlist_dir,
+                existing_keys=existing,
             )
 
             if not selected_tracks:
                 log_info(f"❌ Skipped playlist: {playlist['name']}")
                 continue
 
-            confirm = questionary.confirm(
-                f"Download {len(selected_tracks)} selected tracks into '{playlist['name']}'?"
-            ).ask()
-
-            if not confirm:
-                log_info(f"❌ Skipped playlist: {playlist['name']}")
-                continue
+            jobs.append((playlist, selected_tracks))
 
-            asyncio.run(
-                download_playlist(
-                    playlist["name"],
-                    selected_tracks,
-                    config["output_dir"],
-                    config["audio_format"],
-                    config["sleep_between"],
-                )
-            )
+        if jobs and _confirm_jobs(jobs):
+            _run_async(_download_playlists(jobs, config))
 
     elif choice == "Download from YouTube link/playlist":
         url = questionary.text("Paste YouTube video or playlist URL:").ask()
@@ -304,6 +513,8 @@ def downloads_menu(config):
             log_warning("No URL provided.")
             return
 
+        from downloader.youtube_link_downloader import download_from_link, download_from_playlist
+
         if "playlist" in url.lower():
             download_from_playlist(
                 url, config["output_dir"], config["audio_format"], config["sleep_between"]
@@ -1,7 +1,4 @@
 import questionary
-from downloader.retry_manager import retry_failed
-from managers.file_manager import detect_duplicates, organize_files
-from downloader.metadata import embed_metadata
 
 def management_menu(config):
     """
@@ -19,13 +16,17 @@ def management_menu(config):
     ).ask()
 
     if choice == "Retry failed downloads":
+        from downloader.retry_manager import retry_failed
         retry_failed(config)
 
     elif choice == "Detect duplicates":
+        from managers.file_manager import detect_duplicates
         detect_duplicates(config["output_dir"])
 
     elif choice == "Organize files by artist/album":
+        from managers.file_manager import organize_files
         organize_files(config["output_dir"])
 
     elif choice == "Embed metadata in MP3s":
+        from downloader.metadata import embed_metadata
         embed_metadata(config["output_dir"])
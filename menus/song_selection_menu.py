@@ -4,11 +4,12 @@ from utils.logger import log_info, log_warning
 from utils.track_checker import existing_track_keys_in_dir, track_key
 
 
-def select_songs_for_playlist(playlist_name: str, tracks: list, playlist_dir: str) -> list:
+def select_songs_for_playlist(playlist_name: str, tracks: list, playlist_dir: str, existing_keys: set = None) -> list:
     """Let the user select which songs to download for a given playlist.
 
     - Shows all songs in the playlist.
     - Songs that already exist in playlist_dir start unchecked.
+    - existing_keys: playlist_dir's existing_track_keys_in_dir result, if the caller already has it.
 
     Returns a list of normalized track dicts: [{'artist': str, 'track': str}, ...]
     """
@@ -30,20 +31,19 @@ def select_songs_for_playlist(playlist_name: str, tracks: list, playlist_dir: st
         log_warning(f"Playlist '{playlist_name}' has no valid tracks.")
         return []
 
-    existing_keys = existing_track_keys_in_dir(playlist_dir)
+    if existing_keys is None:
+        existing_keys = existing_track_keys_in_dir(playlist_dir)
+
+    # Key every song once; the selection loop and final mapping reuse these.
+    keyed = [(track_key(t), t) for t in normalized]
 
     # Maintain a working set of selected song keys.
-    selected_keys = {
-        track_key(t)
-        for t in normalized
-        if track_key(t) not in existing_keys
-    }
+    selected_keys = {key for key, _ in keyed} - existing_keys
 
     while True:
         choices = []
 
-        for t in normalized:
-            key = track_key(t)
+        for key, t in keyed:
             exists = key in existing_keys
             label = f"{t['artist']} - {t['track']}" + (" (exists)" if exists else "")
             choices.append(
@@ -80,4 +80,4 @@ def select_songs_for_playlist(playlist_name: str, tracks: list, playlist_dir: st
 
         # Final selection: map keys back to track dicts.
         selected_keys = set(selected)
-        return [t for t in normalized if track_key(t) in selected_keys]
+        return [t for key, t in keyed if key in selected_keys]
@@ -1,3 +1,4 @@
 from .logger import log_info, log_error, log_success, log_warning, setup_logging
+from .json_io import load_json, dump_json
 from .track_checker import check_downloaded_files
 from .system import system_check
@@ -0,0 +1,77 @@
+import os
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
+# Large enough that a typical data file is read or written in one or two syscalls.
+JSON_IO_BUFFER_SIZE = 65536
+
+_NO_DEFAULT = object()
+
+
+def load_json(path: str, default: Any = _NO_DEFAULT) -> Any:
+    """
+    Load a JSON file through a 64 KB buffered reader, parsing with orjson when available.
+
+    If `default` is given it is returned for an empty (or whitespace-only) file;
+    otherwise this raises FileNotFoundError / json.JSONDecodeError exactly like
+    a plain json.load would (orjson.JSONDecodeError subclasses the stdlib one).
+    """
+    with open(path, "rb", buffering=JSON_IO_BUFFER_SIZE) as f:
+        raw = f.read()
+    if default is not _NO_DEFAULT and not raw.strip():
+        return default
+    return parse_json(raw)
+
+
+def parse_json(raw: bytes) -> Any:
+    """Parse JSON bytes with orjson when available, else stdlib json."""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def dump_json_line(obj: Any) -> bytes:
+    """Serialize obj as one compact JSONL line (UTF-8, trailing newline)."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def dump_json(obj: Any, path: str, indent: int = 2, durable: bool = True) -> None:
+    """
+    Atomically write obj as JSON: buffered write to a temp file, fsync, then os.replace.
+
+    Readers see either the old or the new file, never a partial one. Pass
+    durable=False for files that can be rebuilt (caches, sync state) to skip
+    the fsync; the rename still keeps them from being seen half-written.
+    """
+    if orjson and indent in (None, 2):
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    elif indent is None:
+        # Compact output stays on the C encoder fast path
+        data = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    else:
+        data = json.dumps(obj, indent=indent).encode("utf-8")
+    write_atomic(data, path, durable=durable)
+
+
+def write_atomic(data: bytes, path: str, durable: bool = True) -> None:
+    """Write bytes to path via a per-process temp file, fsync (if durable) and os.replace."""
+    # Per-process temp name so two writers can't clobber each other's temp file
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    try:
+        with open(tmp_path, "wb", buffering=JSON_IO_BUFFER_SIZE) as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -1,6 +1,9 @@
 import os
 import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
 from utils.logger import log_info, log_warning, log_error
+from utils.json_io import load_json, parse_json
 
 
 def _normalize_artists(raw: str) -> str:
@@ -136,7 +139,7 @@ def load_primary_tracks(config: dict):
                     continue
                 for t in load_exportify_tracks(os.path.join(exportify_dir, filename)):
                     # Use canonical key for deduplication
-                    key = f"{t.get('artist','').casefold()}|{t.get('track','').casefold()}"
+                    key = (t.get("artist", "").casefold(), t.get("track", "").casefold())
                     if key in seen:
                         continue
                     seen.add(key)
@@ -148,6 +151,27 @@ def load_primary_tracks(config: dict):
     return load_tracks((config or {}).get("tracks_file", "data/tracks.json"))
 
 
+def tracks_log_path(tracks_file: str) -> str:
+    """Append-only JSONL companion of a tracks JSON file (data/tracks.json -> data/tracks.jsonl)."""
+    return os.path.splitext(tracks_file)[0] + ".jsonl"
+
+
+def read_tracks_log(tracks_file: str) -> list:
+    """Return the tracks appended to tracks_file's JSONL log since it was last compacted."""
+    log_path = tracks_log_path(tracks_file)
+    if not os.path.exists(log_path):
+        return []
+
+    tracks = []
+    with open(log_path, "rb") as f:
+        for line in f:
+            try:
+                tracks.append(parse_json(line))
+            except json.JSONDecodeError:
+                continue  # blank or torn final line from an interrupted write
+    return tracks
+
+
 def load_tracks(tracks_file):
     """Load tracks with enhanced metadata extraction."""
     # Allow tracks_file to be a CSV directly (Exportify format)
@@ -155,14 +179,14 @@ def load_tracks(tracks_file):
         return load_exportify_tracks(tracks_file)
 
     try:
-        import json
-        with open(tracks_file, "r", encoding="utf-8") as f:
-            json_data = json.load(f)
+        json_data = load_json(tracks_file)
             
         tracks_data = json_data.get("tracks", [])
         if not isinstance(tracks_data, list):
             log_warning(f"Unexpected tracks format in {tracks_file}")
             return []
+        # Tracks added by sync since the last compaction
+        tracks_data = tracks_data + read_tracks_log(tracks_file)
             
         # Extract metadata from each track
         tracks = []
@@ -216,37 +240,44 @@ def load_playlists(playlists_file):
         return []
 
 
+def _read_playlist_csv(playlist_path: str) -> list:
+    """Parse one Exportify playlist CSV into track dicts; [] (logged) if it can't be read."""
+    tracks = []
+    try:
+        # utf-8-sig handles Exportify BOM
+        with open(playlist_path, newline="", encoding="utf-8-sig") as csvfile:
+            reader = csv.DictReader(csvfile)
+            for row in reader:
+                metadata = _extract_csv_metadata(row)
+                if metadata.get("artist") and metadata.get("track"):
+                    tracks.append(metadata)
+    except Exception as e:
+        log_error(f"Error reading CSV file {playlist_path}: {e}")
+        return []
+    return tracks
+
+
 def load_exportify_playlists(exportify_dir="data/exportify"):
     """
     Scans the exportify folder for CSV files and parses them into playlist dicts.
     Each playlist dict includes comprehensive metadata.
+
+    The CSVs are read on a small thread pool (slow or network storage is
+    the common bottleneck); playlists keep the directory listing order.
     """
     playlists = []
     if not os.path.exists(exportify_dir):
         return playlists
 
-    for file in os.listdir(exportify_dir):
-        if not file.lower().endswith(".csv"):
-            continue
-
-        playlist_name = os.path.splitext(file)[0]
-        playlist_path = os.path.join(exportify_dir, file)
-
-        tracks = []
-        try:
-            # utf-8-sig handles Exportify BOM
-            with open(playlist_path, newline="", encoding="utf-8-sig") as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    metadata = _extract_csv_metadata(row)
-                    if metadata.get("artist") and metadata.get("track"):
-                        tracks.append(metadata)
-        except Exception as e:
-            log_error(f"Error reading CSV file {playlist_path}: {e}")
-            continue
+    files = [f for f in os.listdir(exportify_dir) if f.lower().endswith(".csv")]
+    if not files:
+        return playlists
 
-        if tracks:
-            playlists.append({"name": playlist_name, "tracks": tracks})
+    paths = [os.path.join(exportify_dir, f) for f in files]
+    with ThreadPoolExecutor(max_workers=min(4, len(paths))) as ex:
+        for file, tracks in zip(files, ex.map(_read_playlist_csv, paths)):
+            if tracks:
+                playlists.append({"name": os.path.splitext(file)[0], "tracks": tracks})
 
     return playlists
 
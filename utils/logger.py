@@ -11,18 +11,26 @@ def setup_logging():
         format="%(asctime)s - %(levelname)s - %(message)s"
     )
 
-def log_info(msg):
-    print(Fore.CYAN + msg)
-    logging.info(msg)
+def _format(msg, args):
+    # %-style arguments, as with the stdlib logging calls
+    return msg % args if args else msg
 
-def log_success(msg):
-    print(Fore.GREEN + msg)
-    logging.info(msg)
+def log_info(msg, *args):
+    text = _format(msg, args)
+    print(Fore.CYAN + text)
+    logging.info(text)
 
-def log_error(msg):
-    print(Fore.RED + msg)
-    logging.error(msg)
+def log_success(msg, *args):
+    text = _format(msg, args)
+    print(Fore.GREEN + text)
+    logging.info(text)
 
-def log_warning(msg):
-    print(Fore.YELLOW + msg)
-    logging.warning(msg)
+def log_error(msg, *args):
+    text = _format(msg, args)
+    print(Fore.RED + text)
+    logging.error(text)
+
+def log_warning(msg, *args):
+    text = _format(msg, args)
+    print(Fore.YELLOW + text)
+    logging.warning(text)
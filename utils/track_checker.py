@@ -40,30 +40,34 @@ def parse_track_filename(filename: str):
 
 def existing_track_keys_in_dir(dir_path: str) -> set:
     """Return a set of canonical track keys found in dir_path (non-recursive)."""
+    keys = set()
     try:
-        entries = os.listdir(dir_path)
+        # scandir's d_type lets subfolders be skipped without a stat per entry
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                parsed = parse_track_filename(entry.name)
+                if not parsed:
+                    continue
+                artist, title = parsed
+                keys.add(f"{artist.casefold()}|{title.casefold()}")
     except Exception:
         return set()
 
-    keys = set()
-    for entry in entries:
-        parsed = parse_track_filename(entry)
-        if not parsed:
-            continue
-        artist, title = parsed
-        keys.add(f"{artist.casefold()}|{title.casefold()}")
-
     return keys
 
 
-def check_downloaded_files(output_dir, tracks):
+def check_downloaded_files(output_dir, tracks, existing_keys=None):
     """Return (downloaded_count, pending_tracks) based on existing audio files in output_dir.
 
-    Note: This is non-recursive and extension-agnostic.
+    Note: This is non-recursive and extension-agnostic. Pass existing_keys
+    (from existing_track_keys_in_dir) if output_dir was already scanned.
     """
     os.makedirs(output_dir, exist_ok=True)
 
-    existing_keys = existing_track_keys_in_dir(output_dir)
+    if existing_keys is None:
+        existing_keys = existing_track_keys_in_dir(output_dir)
 
     downloaded = []
     pending = []